@@ -0,0 +1,168 @@
+import asyncio
+import sys
+import time
+from google.genai import types
+from prompts import system_prompt
+from profiling import tracer
+from call_function import call_function, available_functions, READ_ONLY_FUNCTIONS
+from functions.path_validator import start_iteration
+from prefetch import prefetching
+from config import MAX_ITERS, MAX_TOOL_WORKERS, MODEL_NAME, WORKING_DIR
+
+
+class ToolScheduler:
+    """Starts function calls as soon as they arrive in the response stream.
+
+    Read-only calls overlap each other (bounded by MAX_TOOL_WORKERS) and only wait
+    for the latest write/execution. Writes and run_python_file wait for every
+    earlier call, so side effects keep the order the model asked for.
+    """
+
+    def __init__(self, verbose=False, history=None, working_directory=WORKING_DIR):
+        self.verbose = verbose
+        self.history = history
+        self.working_directory = working_directory
+        self.tasks = []
+        self.barrier = None     # Latest non read-only task
+        self.semaphore = asyncio.Semaphore(max(MAX_TOOL_WORKERS, 1))
+        self.abandoned = False
+
+    def submit(self, function_call_part):
+        if function_call_part.name in READ_ONLY_FUNCTIONS:
+            wait_for = [self.barrier] if self.barrier else []
+        else:
+            wait_for = list(self.tasks)
+        task = asyncio.create_task(self._run(function_call_part, wait_for))
+        if function_call_part.name not in READ_ONLY_FUNCTIONS:
+            self.barrier = task
+        self.tasks.append(task)
+
+    async def _run(self, function_call_part, wait_for):
+        if wait_for:
+            await asyncio.wait(wait_for)
+        async with self.semaphore:
+            if self.abandoned:
+                return None
+            return await asyncio.to_thread(
+                call_function, function_call_part, self.verbose, self.history, self.working_directory
+            )
+
+    async def results(self):
+        return await asyncio.gather(*self.tasks)     # Original call order
+
+    async def abandon(self):
+        """Skips calls that have not started and waits for the running ones (a thread cannot be
+        cancelled midway); returns results in call order, None for every skipped call."""
+        self.abandoned = True
+        return await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+async def generate_content_async(client, messages, verbose, history=None, working_directory=WORKING_DIR):
+    """Streams one model turn, dispatching tools while the rest of the response arrives.
+
+    Text parts are written to stdout as they stream in. Works with any client that
+    exposes client.aio.models.generate_content_stream (the real SDK or a local stand-in).
+    Returns the response text when the model made no function calls, else None.
+    """
+    start_iteration()       # Path lookups are memoized within one turn
+    scheduler = ToolScheduler(verbose, history, working_directory)
+    parts = []              # Reassembled model content for the history
+    text_chunks = []
+    usage_metadata = None
+    with tracer.span("generate_content_stream", "model") as span, prefetching(messages, working_directory) as prefetch:
+        started = time.perf_counter()
+        try:
+            stream = await client.aio.models.generate_content_stream(
+                model=MODEL_NAME,
+                contents=messages,
+                config=types.GenerateContentConfig(
+                    tools=[available_functions()], system_instruction=system_prompt
+                ),
+            )
+            async for chunk in stream:
+                span.setdefault("first_chunk_ms", round((time.perf_counter() - started) * 1e3, 1))
+                if chunk.usage_metadata:
+                    usage_metadata = chunk.usage_metadata
+                if not chunk.candidates or not chunk.candidates[0].content:
+                    continue
+                for part in chunk.candidates[0].content.parts or []:
+                    if part.function_call:
+                        span.setdefault("first_action_ms", round((time.perf_counter() - started) * 1e3, 1))
+                        if prefetch:    # Tools start now; keep prefetch reads out of their way
+                            await asyncio.to_thread(prefetch.stop)
+                        scheduler.submit(part.function_call)    # Start right away
+                        parts.append(part)
+                    elif part.text:
+                        sys.stdout.write(part.text)
+                        sys.stdout.flush()
+                        text_chunks.append(part.text)
+                        if parts and parts[-1].text is not None and not parts[-1].function_call:
+                            parts[-1] = types.Part(text=parts[-1].text + part.text)  # Merge stream fragments
+                        else:
+                            parts.append(types.Part(text=part.text))
+        except BaseException:
+            # Calls already running may have changed files: wait for them and keep exactly
+            # those in the history, so the model knows; a turn where nothing ran is dropped
+            results = await scheduler.abandon()
+            ran = [result for result in results if isinstance(result, types.Content)]
+            if ran:
+                kept = iter(results)
+                partial = [part for part in parts
+                           if not part.function_call or isinstance(next(kept), types.Content)]
+                _record_turn(messages, partial, ran, verbose, history)
+            raise
+        finally:
+            if prefetch:
+                await asyncio.to_thread(prefetch.stop)
+    if text_chunks:
+        print()
+
+    if verbose and usage_metadata:
+        print("Prompt tokens:", usage_metadata.prompt_token_count)
+        print("Response tokens:", usage_metadata.candidates_token_count)
+    if history:
+        history.record_usage(usage_metadata)
+        if history.prompt_tokens:
+            tracer.counter("history_tokens", tokens=history.prompt_tokens[-1])
+
+    if not scheduler.tasks:
+        if parts:
+            messages.append(types.Content(role="model", parts=parts))     # Maintain context
+        return "".join(text_chunks)
+
+    _record_turn(messages, parts, await scheduler.results(), verbose, history)
+
+
+def _record_turn(messages, parts, results, verbose, history):
+    """Appends the model content and the matching tool responses, then compacts."""
+    function_responses = []
+    for function_call_result in results:
+        if (
+            not function_call_result.parts
+            or not function_call_result.parts[0].function_response
+        ):
+            raise Exception("empty function call result")
+        if verbose:
+            print(f"-> {function_call_result.parts[0].function_response.response}")
+        function_responses.append(function_call_result.parts[0])
+
+    messages.append(types.Content(role="model", parts=parts))     # Maintain context
+    messages.append(types.Content(role="tool", parts=function_responses))
+    if history:
+        with tracer.span("compact", "history") as span:
+            compacted = span["compacted"] = history.compact(messages)
+        if verbose and compacted:
+            print(f"History compacted: {compacted} entries summarized")
+
+
+async def run_agent_async(client, messages, verbose=False, history=None, working_directory=WORKING_DIR):
+    """Async counterpart of main.run_agent; returns the final response text, or None after MAX_ITERS."""
+    for iteration in range(1, MAX_ITERS + 1):
+        try:
+            with tracer.span("iteration", "iteration", iteration=iteration):
+                final_response = await generate_content_async(client, messages, verbose, history, working_directory)
+            if final_response:
+                return final_response
+        except Exception as e:
+            print(f"Error in generate_content: {e}")
+    return None
@@ -0,0 +1,119 @@
+import sys
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from google import genai
+from google.genai import types
+from dotenv import load_dotenv
+from main import run_agent
+from history import HistoryManager
+from rate_limit import RateLimitedClient
+from response_cache import wrap_client
+from profiling import tracer, trace_path_from_argv
+from config import BATCH_CONCURRENCY, BATCH_MAX_IN_FLIGHT, WORKING_DIR
+
+
+class InFlightLimiter:
+    """Wraps client.models so at most `limit` generate_content calls run at once across sessions."""
+
+    def __init__(self, models, limit):
+        self._models = models
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def generate_content(self, **kwargs):
+        with self._semaphore:
+            return self._models.generate_content(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class SharedClient:
+    """One pooled Gemini client shared by every batch session."""
+
+    def __init__(self, client, max_in_flight):
+        self.models = InFlightLimiter(client.models, max_in_flight)
+        self.aio = client.aio
+
+
+def load_tasks(path):
+    """Reads {"prompt", optional "id", optional "working_dir"} objects, one per line."""
+    tasks = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            task = json.loads(line)
+            if not task.get("prompt"):
+                raise ValueError(f"{path}:{line_no}: task has no prompt")
+            task.setdefault("id", line_no)
+            task.setdefault("working_dir", WORKING_DIR)
+            tasks.append(task)
+    return tasks
+
+
+def run_task(client, task, verbose):
+    """Runs one agent session; returns its result record."""
+    history = HistoryManager()
+    messages = [types.Content(role="user", parts=[types.Part(text=task["prompt"])])]
+    started = time.perf_counter()
+    record = {"id": task["id"], "working_dir": task["working_dir"]}
+    try:
+        final_response = run_agent(client, messages, verbose, history, task["working_dir"])
+        record["final_response"] = final_response
+        record["status"] = "ok" if final_response else "max_iters"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["elapsed_s"] = round(time.perf_counter() - started, 3)
+    record["model_calls"] = len(history.prompt_tokens)
+    record["prompt_tokens"] = sum(history.prompt_tokens)
+    record["response_tokens"] = sum(history.response_tokens)
+    return record
+
+
+def run_batch(client, tasks, output_path, concurrency=BATCH_CONCURRENCY, verbose=False):
+    """Runs tasks `concurrency` at a time, appending each record to output_path as it finishes."""
+    lock = threading.Lock()
+    with open(output_path, "a") as out, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        def run_and_write(task):
+            record = run_task(client, task, verbose)
+            with lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+            return record
+        return list(executor.map(run_and_write, tasks))
+
+
+def main():
+    load_dotenv()
+    verbose = "--verbose" in sys.argv
+    trace_path = trace_path_from_argv(sys.argv)
+    tracer.enabled = trace_path is not None
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(args) != 2:
+        print("AI Code Assistant - batch mode")
+        print("\nUsage: python batch.py tasks.jsonl results.jsonl [--verbose] [--trace=FILE]")
+        print('Each task line: {"prompt": "...", "id": "optional", "working_dir": "optional"}')
+        sys.exit(1)
+
+    tasks = load_tasks(args[0])
+    # Backoff sleeps happen outside the in-flight slots
+    client = wrap_client(lambda: RateLimitedClient(
+        SharedClient(genai.Client(api_key=os.environ.get("GEMINI_API_KEY")), BATCH_MAX_IN_FLIGHT)
+    ))
+    started = time.perf_counter()
+    records = run_batch(client, tasks, args[1], BATCH_CONCURRENCY, verbose)
+    elapsed = time.perf_counter() - started
+    if trace_path:
+        tracer.write(trace_path)
+        print(tracer.summary())
+    ok = sum(1 for r in records if r["status"] == "ok")
+    print(f"Batch finished: {ok}/{len(records)} tasks ok in {elapsed:.1f}s "
+          f"({len(records) / elapsed * 3600:.0f} tasks/hour)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Offline benchmark of the agent loop and tools against a replayed model.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_agent [--files 200] [--depth 3] [--file-size 2000]
+                                     [--repeat 10] [--script recorded.json]
+                                     [--save results.json] [--baseline results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Keep the persisted search index out of the user's cache while benchmarking
+if "AI_INDEX_CACHE_DIR" not in os.environ:
+    _index_cache_dir = tempfile.TemporaryDirectory(prefix="bench-index-")     # Removed at exit
+    os.environ["AI_INDEX_CACHE_DIR"] = _index_cache_dir.name
+
+from google.genai import types
+from main import run_agent
+from history import HistoryManager
+from profiling import tracer
+from tool_cache import tool_cache
+from functions.file_index import clear_indexes
+from functions.trigram_index import forget_indexes
+from benchmarks.fake_model import ReplayClient
+from benchmarks.workdir import generate_workdir, default_script
+
+NOISE_FLOOR_MS = 0.5    # Differences below this never count as regressions
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def reset_caches():
+    tool_cache.clear()
+    clear_indexes()
+    forget_indexes()
+
+
+def run_session(script, workdir):
+    """Runs one replayed session; returns (final_response, wall seconds)."""
+    client = ReplayClient(script)
+    messages = [types.Content(role="user", parts=[types.Part(text="benchmark")])]
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):     # Silence per-call logging
+        final_response = run_agent(client, messages, False, HistoryManager(), workdir)
+    return final_response, time.perf_counter() - started
+
+
+def iteration_overheads(events):
+    """Per-iteration loop time not spent in the model call or in tool execution."""
+    spans = [e for e in events if e["ph"] == "X"]
+    overheads = []
+    for it in (e for e in spans if e["cat"] == "iteration"):
+        start, end = it["ts"], it["ts"] + it["dur"]
+        inside = [e for e in spans if e is not it and start <= e["ts"] and e["ts"] + e["dur"] <= end]
+        model = sum(e["dur"] for e in inside if e["cat"] == "model")
+        tools = [e for e in inside if e["cat"] == "tool"]
+        tool_wall = (max(e["ts"] + e["dur"] for e in tools) - min(e["ts"] for e in tools)) if tools else 0
+        overheads.append(max(it["dur"] - model - tool_wall, 0) / 1e3)
+    return overheads
+
+
+def fresh_workdir(root, args):
+    """Regenerates the fixture project in root; returns the script to replay against it."""
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    paths = generate_workdir(root, args.files, args.depth, args.file_size, args.seed)
+    if not args.script:
+        return default_script(paths)
+    with open(args.script) as f:
+        return json.load(f)
+
+
+def run_benchmark(args):
+    with tempfile.TemporaryDirectory(prefix="bench-workdir-") as tmp:
+        root = os.path.join(tmp, "project")
+        walls, overheads, tool_ms = [], [], {}
+        for _ in range(args.repeat):
+            script = fresh_workdir(root, args)
+            if not args.warm:
+                reset_caches()
+            tracer.events.clear()
+            tracer.enabled = True
+            final_response, wall = run_session(script, root)
+            tracer.enabled = False
+            if not final_response:
+                raise RuntimeError("replayed session did not finish; check the script length against AI_MAX_ITERS")
+            walls.append(wall * 1e3)
+            overheads.extend(iteration_overheads(tracer.events))
+            for e in tracer.events:
+                if e["ph"] == "X" and e["cat"] == "tool":
+                    tool_ms.setdefault(e["name"], []).append(e["dur"] / 1e3)
+
+        # Separate pass for memory, tracemalloc would distort the timings above
+        script = fresh_workdir(root, args)
+        reset_caches()
+        tracemalloc.start()
+        run_session(script, root)
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    metrics = {
+        "session_wall_ms.p50": percentile(walls, 50),
+        "session_wall_ms.p95": percentile(walls, 95),
+        "iteration_overhead_ms.p50": percentile(overheads, 50),
+        "iteration_overhead_ms.p95": percentile(overheads, 95),
+        "peak_memory_kb": peak_kb,
+    }
+    for name, values in sorted(tool_ms.items()):
+        for pct in (50, 95, 99):
+            metrics[f"tool.{name}.p{pct}_ms"] = percentile(values, pct)
+    return metrics
+
+
+def compare(metrics, baseline, tolerance):
+    """Prints metric deltas against a baseline; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'metric':<42}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, value in metrics.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        change = (value - base) / base * 100 if base else 0.0
+        regressed = value > base * (1 + tolerance) and (name.startswith("peak") or value - base > NOISE_FLOOR_MS)
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<42}{base:>12.2f}{value:>12.2f}{change:>9.1f}%{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the agent loop and tools.")
+    parser.add_argument("--files", type=int, default=200, help="Python files in the generated working dir")
+    parser.add_argument("--depth", type=int, default=3, help="Directory depth of the generated working dir")
+    parser.add_argument("--file-size", type=int, default=2000, help="Size of each generated file in bytes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10, help="Replayed sessions to time")
+    parser.add_argument("--script", help="Recorded model turns (JSON) to replay instead of the default session")
+    parser.add_argument("--warm", action="store_true", help="Keep tool caches and indexes between sessions")
+    parser.add_argument("--save", help="Write the metrics to this JSON file")
+    parser.add_argument("--baseline", help="Compare against metrics saved by an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    metrics = run_benchmark(args)
+    print(f"{'metric':<42}{'value':>12}")
+    for name, value in metrics.items():
+        print(f"{name:<42}{value:>12.2f}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(metrics, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(metrics, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metrics regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
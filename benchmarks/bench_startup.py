@@ -0,0 +1,85 @@
+"""Cold-start benchmark and import-time budget for the CLI and the tool modules.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup [--repeat 10] [--budget-ms 150]
+
+Each sample is a fresh interpreter, as when a job runner spawns the CLI. Exits with
+status 1 if a module is over budget or imports the SDK before a model call is made.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must load without the SDK: the CLI up to its usage message, the tool
+# dispatcher, and the tools used directly by tests.py
+MODULES = ["main", "call_function", "functions.run_python", "functions.get_file_content"]
+DEFERRED_MODULES = ("google.genai", "dotenv", "asyncio")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - started) * 1000
+loaded = [name for name in {prefixes!r} if name in sys.modules]
+print(json.dumps({{"import_ms": elapsed_ms, "deferred_loaded": loaded}}))
+"""
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def probe(module):
+    """Imports module in a fresh interpreter; returns (import_ms, deferred modules loaded)."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, prefixes=DEFERRED_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["import_ms"], result["deferred_loaded"]
+
+
+def cli_usage_ms():
+    """Wall time of `python main.py` with no prompt, interpreter startup included."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "main.py"], cwd=ROOT, capture_output=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark of the CLI and tool modules.")
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per measurement")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Allowed median import time per module")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<42}{'p50 ms':>10}{'p95 ms':>10}")
+    for module in MODULES:
+        samples = []
+        for _ in range(args.repeat):
+            import_ms, loaded = probe(module)
+            samples.append(import_ms)
+        p50 = percentile(samples, 50)
+        print(f"{module:<42}{p50:>10.1f}{percentile(samples, 95):>10.1f}")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} at startup")
+        if p50 > args.budget_ms:
+            failures.append(f"{module} takes {p50:.1f} ms to import (budget {args.budget_ms:.0f} ms)")
+
+    usage = [cli_usage_ms() for _ in range(args.repeat)]
+    print(f"{'python main.py (usage, wall)':<42}{percentile(usage, 50):>10.1f}{percentile(usage, 95):>10.1f}")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import json
+from google.genai import types
+
+
+def _part(spec):
+    if "function_call" in spec:
+        call = spec["function_call"]
+        return types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {})))
+    return types.Part(text=spec["text"])
+
+
+def _usage(contents, parts):
+    """Token counts estimated at 4 characters per token, like the real API reports."""
+    prompt_chars = sum(len(str(c.parts)) for c in contents)
+    response_chars = sum(len(str(p)) for p in parts)
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt_chars // 4,
+        candidates_token_count=response_chars // 4,
+        total_token_count=(prompt_chars + response_chars) // 4,
+    )
+
+
+class ReplayModels:
+    """Returns recorded model turns in order, ignoring what is sent.
+
+    A script is a list of turns; each turn is a list of parts, either {"text": ...} or
+    {"function_call": {"name": ..., "args": {...}}}.
+    """
+
+    def __init__(self, turns):
+        self.turns = turns
+        self.position = 0
+
+    def _next_parts(self):
+        spec = self.turns[min(self.position, len(self.turns) - 1)]
+        self.position += 1
+        return [_part(p) for p in spec]
+
+    def generate_content(self, model, contents, config=None):
+        parts = self._next_parts()
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=parts))],
+            usage_metadata=_usage(contents, parts),
+        )
+
+
+class AsyncReplayModels(ReplayModels):
+    async def generate_content_stream(self, model, contents, config=None):
+        parts = self._next_parts()
+
+        async def chunks():
+            for i, part in enumerate(parts):
+                yield types.GenerateContentResponse(
+                    candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))],
+                    usage_metadata=_usage(contents, parts) if i == len(parts) - 1 else None,
+                )
+        return chunks()
+
+
+class _Aio:
+    def __init__(self, models):
+        self.models = models
+
+
+class ReplayClient:
+    """Drop-in for genai.Client that replays a script, for offline runs and benchmarks."""
+
+    def __init__(self, turns):
+        self.models = ReplayModels(turns)
+        self.aio = _Aio(AsyncReplayModels(turns))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
@@ -0,0 +1,57 @@
+import os
+import random
+
+MODULE_TEMPLATE = '''import os
+from pkg{parent} import helper_{dep}
+
+
+def function_{index}(value):   # Generated benchmark function
+    total = 0
+    for i in range(value):
+        total += i * {index}
+    return total
+
+'''
+
+
+def generate_workdir(root, files=100, depth=3, file_size=2000, seed=0):
+    """Creates a deterministic tree of Python files under root; returns their relative paths."""
+    rng = random.Random(seed)
+    dirs = [""]
+    for level in range(1, depth + 1):
+        dirs.extend(os.path.join(*(f"pkg{rng.randrange(4)}_{d}" for d in range(level))) for _ in range(2))
+    paths = []
+    for index in range(files):
+        rel_dir = dirs[index % len(dirs)]
+        rel_path = os.path.join(rel_dir, f"module_{index}.py")
+        body = MODULE_TEMPLATE.format(parent=index % 7, dep=rng.randrange(files), index=index)
+        while len(body) < file_size:
+            body += f"# padding line {len(body)} for module {index}\n"
+        abs_path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with open(abs_path, "w") as f:
+            f.write(body[:file_size])
+        paths.append(rel_path.replace(os.sep, "/"))
+    with open(os.path.join(root, "tests.py"), "w") as f:
+        f.write("print('ok')\n")
+    return paths
+
+
+def default_script(paths, reads_per_turn=3):
+    """A typical debugging session over the generated tree, as a replay script."""
+    def call(name, **args):
+        return {"function_call": {"name": name, "args": args}}
+
+    turns = [
+        [call("get_files_info"), call("get_project_tree", max_depth=4, pattern="*.py")],
+        [call("search_code", query="function_1"), call("search_code", query=r"helper_\d+", regex=True)],
+    ]
+    for start in range(0, min(len(paths), reads_per_turn * 3), reads_per_turn):
+        turns.append([call("get_file_content", file_path=p) for p in paths[start:start + reads_per_turn]])
+    turns.append([call("get_file_content", file_path=paths[0])])    # Repeat read
+    turns.append([call("apply_edit", file_path=paths[0], edits=[{"search": "total = 0", "replace": "total = 1"}])])
+    turns.append([call("write_file", file_path="notes.txt", content="x" * 2000)])
+    turns.append([call("run_python_file", file_path="tests.py")])
+    turns.append([call("get_file_content", file_path=paths[0], offset=1, limit=20)])
+    turns.append([{"text": "Benchmark session finished."}])
+    return turns
@@ -1,4 +1,5 @@
 import sys
+from pkg.bulk import run_bulk
 from pkg.calculator import Calculator
 from pkg.render import render
 
@@ -8,9 +9,14 @@ def main():     # Entry point for calculator CLI application.
     if len(sys.argv) <= 1:
         print("Calculator App")
         print('Usage: python main.py "<expression>"')
+        print('       python main.py --bulk [FILE] [--workers=N]')
         print('Example: python main.py "3 + 5"')
         return
 
+    if sys.argv[1] == "--bulk":
+        bulk_main(sys.argv[2:])
+        return
+
     expression = " ".join(sys.argv[1:])
     try:
         result = calculator.evaluate(expression)
@@ -20,5 +26,20 @@ def main():     # Entry point for calculator CLI application.
         print(f"Error: {e}")
 
 
+def bulk_main(args):     # Evaluates one expression per line of FILE (or stdin) and prints one result per line.
+    workers = 0
+    paths = []
+    for arg in args:
+        if arg.startswith("--workers="):
+            workers = int(arg.split("=", 1)[1])
+        else:
+            paths.append(arg)
+    if not paths or paths[0] == "-":
+        run_bulk(sys.stdin, sys.stdout, workers)
+        return
+    with open(paths[0]) as f:
+        run_bulk(f, sys.stdout, workers)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
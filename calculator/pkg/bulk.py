@@ -0,0 +1,40 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pkg.calculator import Calculator
+from pkg.render import format_result
+
+CHUNK_LINES = 10000     # Expressions sent to a worker process at a time
+calculator = Calculator()   # One instance per process, so compiled expressions are reused
+
+
+def evaluate_lines(lines):  # One output line per input line: the result, "Error: ..." or empty for blank input.
+    results = []
+    for line in lines:
+        expression = line.strip()
+        if not expression:
+            results.append("")
+            continue
+        try:
+            results.append(format_result(calculator.evaluate(expression)))
+        except Exception as e:
+            results.append(f"Error: {e}")
+    return results
+
+
+def run_bulk(lines, out, workers=0, chunk_lines=CHUNK_LINES):     # Streams results for an iterable of lines to out, in input order.
+    lines = iter(lines)
+    chunks = iter(lambda: list(islice(lines, chunk_lines)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            out.write("".join(f"{r}\n" for r in evaluate_lines(chunk)))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()   # Futures in input order; bounded so huge inputs are never read all at once
+        for chunk in chunks:
+            pending.append(executor.submit(evaluate_lines, chunk))
+            if len(pending) >= workers * 2:
+                out.write("".join(f"{r}\n" for r in pending.popleft().result()))
+        while pending:
+            out.write("".join(f"{r}\n" for r in pending.popleft().result()))
@@ -1,61 +1,130 @@
-class Calculator:   # A basic calculator that evaluates infix mathematical expressions. Supports +, -, *, / operations.
+import operator
+from collections import namedtuple
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:     # Only evaluate_batch needs NumPy
+    np = None
+
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+PRECEDENCE = {
+    "+": 1,   # Lowest precedence
+    "-": 1,
+    "*": 2,
+    "/": 2,   # Highest precedence
+}
+COMPILE_CACHE_SIZE = 1024   # Distinct expressions kept compiled
+CONSTANT, VARIABLE, APPLY = "constant", "variable", "apply"     # Program step kinds
+
+# A parsed expression: RPN tokens, variable names in order of first use, and a function
+# taking one argument per variable that works on floats and NumPy arrays alike.
+Program = namedtuple("Program", ["expression", "rpn", "variables", "function"])
+
+
+class Calculator:   # A basic calculator that evaluates infix mathematical expressions. Supports +, -, *, / operations and named variables.
 
     def __init__(self):
-        # Operator to function mapping with lambda expressions
-        self.operators = {
-            "+": lambda a, b: a + b,
-            "-": lambda a, b: a - b,
-            "*": lambda a, b: a * b,
-            "/": lambda a, b: a / b,
-        }
-        self.precedence = {
-            "+": 1,   # Lowest precedence
-            "-": 1,
-            "*": 2,
-            "/": 2,   # Highest precedence
-        }
-
-    def evaluate(self, expression):                     # Public method to evaluate an expression string.
-        if not expression or expression.isspace():      # expression: String containing math expression (e.g. "3 + 5").
-            return None                                 # ValueError: For invalid expressions or operators.
-        tokens = expression.strip().split()             # Tokenize and process.
-        return self._evaluate_infix(tokens)             # float/int: Result of calculation. Delegate to infix processor.
-
-    def _evaluate_infix(self, tokens):    # Algorithm implementation for infix notation. Uses two stacks (values and operators) to handle precedence.
-        values = []       # Stack for operands
-        operators = []    # Stack for operators
-
-        for token in tokens:
-            if token in self.operators:
-                while (
-                    operators
-                    and operators[-1] in self.operators
-                    and self.precedence[operators[-1]] >= self.precedence[token]
-                ):
-                    self._apply_operator(operators, values)
-                operators.append(token)
-            else:
-                try:
-                    values.append(float(token))
-                except ValueError:
+        # Operator to function mapping
+        self.operators = OPERATORS
+        self.precedence = PRECEDENCE
+
+    def evaluate(self, expression, variables=None):     # Public method to evaluate an expression string.
+        if not expression or expression.isspace():      # expression: String containing math expression (e.g. "3 + 5" or "x * 2").
+            return None                                 # ValueError: For invalid expressions, operators or missing variables.
+        program = self.compile(expression)              # float/int: Result of calculation. Parsing is cached per expression.
+        return program.function(*_variable_values(program, variables or {}))
+
+    def evaluate_batch(self, expression, variables):    # Evaluates one expression over NumPy arrays of variable values.
+        if np is None:                                  # variables: mapping of name -> array-like, broadcast against each other.
+            raise ImportError("evaluate_batch requires numpy; install it with: pip install .[batch]")
+        program = self.compile(expression)              # numpy.ndarray: One result per row, computed with whole-array operations.
+        arrays = [np.asarray(v, dtype=float) for v in _variable_values(program, variables)]
+        shape = np.broadcast_shapes(*(a.shape for a in arrays)) if arrays else ()
+        with np.errstate(divide="ignore", invalid="ignore"):    # x / 0 gives inf/nan per row instead of failing the batch
+            result = program.function(*arrays)
+        return np.broadcast_to(np.asarray(result, dtype=float), shape).copy()
+
+    def compile(self, expression):      # Parses an expression once; later calls with the same string reuse the Program.
+        return compile_expression(expression.strip())
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression):
+    rpn = _to_rpn(expression.split())
+    variables = list(dict.fromkeys(token for token in rpn if isinstance(token, str) and token not in OPERATORS))
+    return Program(expression, tuple(rpn), tuple(variables), _make_function(rpn, variables))
+
+
+def _to_rpn(tokens):    # Shunting-yard over whitespace-separated tokens; same precedence and left associativity as before.
+    output = []
+    operators = []
+    depth = 0           # Operands on the value stack, checked as the RPN is emitted
+
+    def emit(op):
+        nonlocal depth
+        if depth < 2:
+            raise ValueError(f"not enough operands for operator {op}")
+        output.append(op)
+        depth -= 1
+
+    for token in tokens:
+        if token in OPERATORS:
+            while operators and PRECEDENCE[operators[-1]] >= PRECEDENCE[token]:
+                emit(operators.pop())
+            operators.append(token)
+        else:
+            try:
+                output.append(float(token))     # Numbers first, so "inf" and "nan" keep their float meaning
+            except ValueError:
+                if not token.isidentifier():
                     raise ValueError(f"invalid token: {token}")
+                output.append(token)            # Variable
+            depth += 1
 
-        while operators:
-            self._apply_operator(operators, values)
+    while operators:
+        emit(operators.pop())
 
-        if len(values) != 1:
-            raise ValueError("invalid expression")
+    if depth != 1:
+        raise ValueError("invalid expression")
 
-        return values[0]
+    return output
+
+
+def _make_function(rpn, variables):    # Resolves every token once, so running the program is a single loop with no parsing or lookups.
+    index = {name: i for i, name in enumerate(variables)}
+    steps = []
+    for token in rpn:
+        if isinstance(token, float):
+            steps.append((CONSTANT, token))
+        elif token in OPERATORS:
+            steps.append((APPLY, OPERATORS[token]))
+        else:
+            steps.append((VARIABLE, index[token]))
+    steps = tuple(steps)
+
+    def program(*values):
+        stack = []
+        for kind, arg in steps:
+            if kind is APPLY:
+                b = stack.pop()
+                stack[-1] = arg(stack[-1], b)
+            elif kind is CONSTANT:
+                stack.append(arg)
+            else:
+                stack.append(values[arg])
+        return stack[0]
 
-    def _apply_operator(self, operators, values):
-        if not operators:
-            return
+    return program
 
-        operator = operators.pop()
-        if len(values) < 2:
-            raise ValueError(f"not enough operands for operator {operator}")
 
-        b = values.pop()
-        a = values.pop()
-        values.append(self.operators[operator](a, b))
\ No newline at end of file
+def _variable_values(program, variables):
+    missing = [name for name in program.variables if name not in variables]
+    if missing:
+        raise ValueError(f"missing value for variable: {', '.join(missing)}")
+    return [variables[name] for name in program.variables]
@@ -1,8 +1,11 @@
-def render(expression, result):   # Formats calculation results in an ASCII box.
+def format_result(result):   # Whole numbers print without a trailing ".0".
     if isinstance(result, float) and result.is_integer():
-        result_str = str(int(result))
-    else:
-        result_str = str(result)
+        return str(int(result))
+    return str(result)
+
+
+def render(expression, result):   # Formats calculation results in an ASCII box.
+    result_str = format_result(result)
 
     box_width = max(len(expression), len(result_str)) + 4
 
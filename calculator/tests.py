@@ -1,5 +1,8 @@
+import io
 import unittest
-from pkg.calculator import Calculator
+from unittest import mock
+from pkg.bulk import evaluate_lines, run_bulk
+from pkg.calculator import Calculator, np
 
 
 class TestCalculator(unittest.TestCase):        # Unit tests for Calculator class.
@@ -42,6 +45,41 @@ class TestCalculator(unittest.TestCase):        # Unit tests for Calculator clas
         with self.assertRaises(ValueError):
             self.calculator.evaluate("+ 3")
 
+    def test_variables(self):
+        result = self.calculator.evaluate("x * x + y", {"x": 3, "y": 1})
+        self.assertEqual(result, 10)
+
+    def test_missing_variable(self):
+        with self.assertRaises(ValueError):
+            self.calculator.evaluate("x + 1")
+
+    def test_compile_is_cached(self):
+        program = self.calculator.compile("3 * x + 5")
+        self.assertIs(self.calculator.compile(" 3 * x + 5 "), program)
+        self.assertEqual(program.variables, ("x",))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_evaluate_batch(self):
+        result = self.calculator.evaluate_batch("2 * x - y / 4", {"x": np.arange(4), "y": 8})
+        self.assertEqual(result.tolist(), [-2, 0, 2, 4])
+
+    def test_evaluate_batch_without_numpy_names_the_extra(self):
+        with mock.patch("pkg.calculator.np", None):
+            with self.assertRaisesRegex(ImportError, r"pip install \.\[batch\]"):
+                self.calculator.evaluate_batch("x + 1", {"x": [1, 2]})
+
+
+class TestBulk(unittest.TestCase):      # Unit tests for line-per-result bulk evaluation.
+    def test_evaluate_lines(self):
+        results = evaluate_lines(["3 + 5\n", "\n", "$ 3\n", "10 / 4\n"])
+        self.assertEqual(results, ["8", "", "Error: invalid token: $", "2.5"])
+
+    def test_process_pool_keeps_input_order(self):
+        lines = [f"{i} * 2\n" for i in range(50)]
+        out = io.StringIO()
+        run_bulk(lines, out, workers=2, chunk_lines=7)
+        self.assertEqual(out.getvalue().splitlines(), [str(i * 2) for i in range(50)])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,23 +1,65 @@
-from google.genai import types
+import os
+from contextlib import nullcontext
+from functools import cache
 
 from functions.get_files_info import get_files_info, schema_get_files_info
-from functions.get_file_content import get_file_content, schema_get_file_content
+from functions.get_project_tree import get_project_tree, schema_get_project_tree
+from functions.get_file_content import (
+    get_file_content,
+    get_file_contents,
+    schema_get_file_content,
+    schema_get_file_contents,
+)
 from functions.run_python import run_python_file, schema_run_python_file
+from functions.run_tests import run_tests, schema_run_tests, note_changed
 from functions.write_file_content import write_file, schema_write_file
+from functions.apply_edit import apply_edit, schema_apply_edit
+from functions.search_code import search_code, schema_search_code
+from functions.checkpoints import revert, schema_revert, get_checkpoint_store
+from functions.file_index import invalidate_path, clear_indexes
+from functions.path_validator import clear_path_cache, link_target
+from functions.trigram_index import update_search_path, mark_search_stale
+from tool_cache import tool_cache, target_path
+from output_compression import compress_output
+from profiling import tracer
 from config import WORKING_DIR
 
-# Available functions for LLM to call
-available_functions = types.Tool(
-    function_declarations=[
-        schema_get_files_info,
-        schema_get_file_content,
-        schema_run_python_file,
-        schema_write_file,
-    ]
-)
+# Available functions for LLM to call, built on first model request so that importing
+# the tools (tests, --help, job runners) never loads the SDK
+@cache
+def available_functions():
+    from google.genai import types
+    return types.Tool(
+        function_declarations=[
+            schema_get_files_info(),
+            schema_get_project_tree(),
+            schema_get_file_content(),
+            schema_get_file_contents(),
+            schema_search_code(),
+            schema_run_python_file(),
+            schema_run_tests(),
+            schema_write_file(),
+            schema_apply_edit(),
+            schema_revert(),
+        ]
+    )
 
+# Tools that never modify the working directory, safe to run concurrently
+READ_ONLY_FUNCTIONS = {
+    "get_files_info",
+    "get_project_tree",
+    "get_file_content",
+    "get_file_contents",
+    "search_code",
+}
+# Tools that change exactly the file named by their file_path argument
+WRITE_FUNCTIONS = {"write_file", "apply_edit"}
+# Results that depend only on the target path's own mtime/size (see tool_cache)
+CACHEABLE_FUNCTIONS = {"get_files_info", "get_file_content"}
 
-def call_function(function_call_part, verbose=False):
+
+def call_function(function_call_part, verbose=False, history=None, working_directory=WORKING_DIR):
+    from google.genai import types
     # Print verbose or minimal function call info
     if verbose:
         print(
@@ -28,9 +70,15 @@ def call_function(function_call_part, verbose=False):
     # Map function names to their implementations
     function_map = {
         "get_files_info": get_files_info,
+        "get_project_tree": get_project_tree,
         "get_file_content": get_file_content,
+        "get_file_contents": get_file_contents,
+        "search_code": search_code,
         "run_python_file": run_python_file,
+        "run_tests": run_tests,
         "write_file": write_file,
+        "apply_edit": apply_edit,
+        "revert": revert,
     }
     function_name = function_call_part.name
     # Handle unknown functions
@@ -46,9 +94,36 @@ def call_function(function_call_part, verbose=False):
         )
     # Add working directory to args
     args = dict(function_call_part.args)
-    args["working_directory"] = WORKING_DIR   # Critical security addition
-    # Execute the function with expanded kwargs
-    function_result = function_map[function_name](**args)
+    args["working_directory"] = working_directory   # Critical security addition
+    # Execute the function with expanded kwargs, reads go through the result cache
+    function = function_map[function_name]
+    with tracer.span(function_name, "tool") as span:
+        if function_name in CACHEABLE_FUNCTIONS:
+            function_result, read_fingerprint, hit = tool_cache.call(function_name, args, function)
+            if verbose and hit:
+                print(f" - Cache hit: {function_name}")
+        else:
+            turn = len(history.prompt_tokens) if history else 0
+            with checkpointed(function_name, args, turn):
+                function_result, read_fingerprint, hit = function(**args), None, False
+            if function_name not in READ_ONLY_FUNCTIONS:
+                invalidate_after(function_name, args)
+            if function_name in WRITE_FUNCTIONS and not function_result.startswith("Error"):
+                function_result += f"\n[Previous version saved in checkpoint {turn}; revert(checkpoint={turn}) undoes this turn's writes]"
+        span["output_bytes"] = len(function_result)
+        span["cache_hit"] = hit
+
+    since_turn = None
+    if history and function_name == "get_file_content" and read_fingerprint:
+        since_turn = history.note_read(args, read_fingerprint)
+    if since_turn is not None:      # Model already holds this exact content
+        response = {
+            "result": f'[File "{args["file_path"]}" unchanged since turn {since_turn}; see the earlier result]',
+            "unchanged_since_turn": since_turn,
+        }
+    else:   # Shrink the result before it enters the history
+        function_result, extra = compress_output(function_name, args, function_result, history)
+        response = {"result": function_result, **extra}     # Wrapped in dict
 
     # Return standardized response format
     return types.Content(
@@ -56,7 +131,35 @@ def call_function(function_call_part, verbose=False):
         parts=[
             types.Part.from_function_response(
                 name=function_name,
-                response={"result": function_result},   # Wrapped in dict
+                response=response,
             )
         ],
-    )
\ No newline at end of file
+    )
+
+
+def checkpointed(function_name, args, turn):
+    """Saves the file a write is about to replace into the working dir's checkpoint for `turn`."""
+    if function_name not in WRITE_FUNCTIONS:
+        return nullcontext()
+    abs_working_dir = os.path.abspath(args["working_directory"])
+    abs_path = target_path(args)
+    if os.path.commonpath([abs_working_dir, abs_path]) != abs_working_dir:
+        return nullcontext()    # The tool itself reports the error
+    return get_checkpoint_store(abs_working_dir).recording(abs_path, turn)
+
+
+def invalidate_after(function_name, args):
+    """Keeps every cache and index in step with a call that may have changed files."""
+    if function_name in WRITE_FUNCTIONS:
+        abs_path = target_path(args)
+        tool_cache.invalidate(abs_path)
+        abs_path = link_target(os.path.abspath(args["working_directory"]), abs_path)    # The file that changed
+        tool_cache.invalidate(abs_path)
+        invalidate_path(abs_path)
+        update_search_path(abs_path)
+        note_changed(abs_path)
+    else:   # Scripts may create or resize files anywhere in the working dir
+        tool_cache.invalidate_listings()
+        clear_indexes()
+        clear_path_cache()
+        mark_search_stale()
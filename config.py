@@ -2,4 +2,39 @@ import os
 
 MAX_CHARS = 10000
 WORKING_DIR = os.getenv("AI_WORKING_DIR", "./calculator")
-MAX_ITERS = int(os.getenv("AI_MAX_ITERS", "20"))
\ No newline at end of file
+MAX_ITERS = int(os.getenv("AI_MAX_ITERS", "20"))
+MAX_TOOL_WORKERS = int(os.getenv("AI_MAX_TOOL_WORKERS", "4"))
+MODEL_NAME = os.getenv("AI_MODEL_NAME", "gemini-2.0-flash-001")
+HISTORY_TOKEN_BUDGET = int(os.getenv("AI_HISTORY_TOKEN_BUDGET", "32000"))
+HISTORY_KEEP_TURNS = int(os.getenv("AI_HISTORY_KEEP_TURNS", "2"))
+TOOL_CACHE_MAX_BYTES = int(os.getenv("AI_TOOL_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+PYTHON_WORKERS = int(os.getenv("AI_PYTHON_WORKERS", "0"))
+OUTPUT_HEAD_BYTES = int(os.getenv("AI_OUTPUT_HEAD_BYTES", "4000"))
+OUTPUT_TAIL_BYTES = int(os.getenv("AI_OUTPUT_TAIL_BYTES", "4000"))
+OUTPUT_KILL_BYTES = int(os.getenv("AI_OUTPUT_KILL_BYTES", str(64 * 1024 * 1024)))
+TREE_MAX_ENTRIES = int(os.getenv("AI_TREE_MAX_ENTRIES", "500"))
+MAX_BATCH_FILES = int(os.getenv("AI_MAX_BATCH_FILES", "20"))
+SEARCH_MAX_RESULTS = int(os.getenv("AI_SEARCH_MAX_RESULTS", "100"))
+SEARCH_MAX_FILE_BYTES = int(os.getenv("AI_SEARCH_MAX_FILE_BYTES", str(1024 * 1024)))
+INDEX_CACHE_DIR = os.getenv("AI_INDEX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai-agent-debuggy"))
+BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_IN_FLIGHT = int(os.getenv("AI_BATCH_MAX_IN_FLIGHT", "4"))
+RATE_LIMIT_RPM = int(os.getenv("AI_RATE_LIMIT_RPM", "0"))
+RATE_LIMIT_TPM = int(os.getenv("AI_RATE_LIMIT_TPM", "0"))
+RETRY_MAX_ATTEMPTS = int(os.getenv("AI_RETRY_MAX_ATTEMPTS", "6"))
+RETRY_BASE_DELAY = float(os.getenv("AI_RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("AI_RETRY_MAX_DELAY", "60.0"))
+RESPONSE_CACHE_MODE = os.getenv("AI_RESPONSE_CACHE", "off")
+RESPONSE_CACHE_DIR = os.getenv("AI_RESPONSE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai-agent-debuggy", "responses"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("AI_RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+TEST_TIMEOUT = int(os.getenv("AI_TEST_TIMEOUT", "30"))
+TEST_WORKERS = int(os.getenv("AI_TEST_WORKERS", str(os.cpu_count() or 2)))
+CHECKPOINT_DIR = os.getenv("AI_CHECKPOINT_DIR", os.path.join(INDEX_CACHE_DIR, "checkpoints"))
+TOOL_OUTPUT_BUDGET = int(os.getenv("AI_TOOL_OUTPUT_BUDGET", "32768"))
+TOOL_OUTPUT_BUDGETS = {     # Per-tool overrides, e.g. "run_python_file=8000,get_file_contents=65536"
+    name.strip(): int(size)
+    for name, _, size in (item.partition("=") for item in os.getenv("AI_TOOL_OUTPUT_BUDGETS", "").split(",") if item)
+}
+LISTING_MAX_ENTRIES = int(os.getenv("AI_LISTING_MAX_ENTRIES", "100"))
+PREFETCH_MAX_BYTES = int(os.getenv("AI_PREFETCH_MAX_BYTES", str(1024 * 1024)))
+PREFETCH_MAX_FILES = int(os.getenv("AI_PREFETCH_MAX_FILES", "16"))
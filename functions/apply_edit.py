@@ -0,0 +1,226 @@
+import os
+import re
+import stat
+import tempfile
+import threading
+from functools import cache
+from functions.path_validator import resolve_path, stat_path, forget_path
+from functions.checkpoints import has_other_links
+
+CONTEXT_LINES = 2   # Unchanged lines shown around each edited region
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+_new_file_mode = None
+_new_file_mode_lock = threading.Lock()
+
+
+class EditError(Exception):
+    pass
+
+
+def _get_new_file_mode():
+    """Mode for files created by atomic_write: 0o666 minus the umask, as open() would give.
+
+    os.umask can only be read by setting it, so it is read once, on the first new file,
+    under a lock so concurrent writers never see the temporary zero mask.
+    """
+    global _new_file_mode
+    with _new_file_mode_lock:
+        if _new_file_mode is None:
+            umask = os.umask(0)
+            os.umask(umask)
+            _new_file_mode = 0o666 & ~umask
+        return _new_file_mode
+
+
+def apply_edit(working_directory, file_path, edits=None, diff=None):
+    # Validate containment and stat the target once
+    path, error = resolve_path(working_directory, file_path)
+    if error:
+        return error  # Return error message
+    abs_file_path = path.abs_path
+    if not path.is_file:
+        return f'Error: File not found or is not a regular file: "{file_path}"'
+    if not edits and not diff:
+        return "Error: provide either edits or diff"
+    try:
+        with open(abs_file_path, "r", newline="") as f:
+            original = f.read()
+        lines = original.splitlines(keepends=True)
+        if edits:
+            lines, regions = _apply_search_replace(lines, edits)
+        else:
+            lines, regions = _apply_unified_diff(lines, diff)
+        regions = _merge_regions(regions)
+        atomic_write(abs_file_path, "".join(lines))
+        return f'Successfully edited "{file_path}" ({len(regions)} regions changed)\n' + _show_regions(lines, regions)
+    except EditError as e:
+        return f'Error: edit not applied to "{file_path}": {e}'
+    except Exception as e:
+        return f"Error: editing file: {e}"
+
+
+def _apply_search_replace(lines, edits):
+    """Applies {search, replace} hunks in order; each search must match exactly once."""
+    text = "".join(lines)
+    spans = []
+    for i, edit in enumerate(edits, 1):
+        search, replace = edit.get("search", ""), edit.get("replace", "")
+        if not search:
+            raise EditError(f"hunk {i} has an empty search string")
+        count = text.count(search)
+        if count != 1:
+            raise EditError(f"hunk {i} search text {'not found' if count == 0 else f'found {count} times'}")
+        start = text.index(search)
+        old_end, new_end = start + len(search), start + len(replace)
+        text = text[:start] + replace + text[old_end:]
+
+        def moved(pos):     # Where an earlier span boundary ends up after this hunk
+            if pos >= old_end:
+                return pos + new_end - old_end
+            return min(pos, new_end) if pos > start else pos
+
+        spans = [(moved(s), moved(e)) for s, e in spans]
+        spans.append((start, new_end))
+    new_lines = text.splitlines(keepends=True)
+    regions = []
+    for start, end in spans:
+        first = text.count("\n", 0, start)
+        regions.append((first, text.count("\n", 0, end - 1) + 1 if end > start else first))
+    return new_lines, regions
+
+
+def _apply_unified_diff(lines, diff):
+    """Applies the hunks of a unified diff for a single file, checking every context line."""
+    hunks = []
+    current = None
+    for raw in diff.splitlines():
+        header = HUNK_HEADER.match(raw)
+        if header:
+            old_count = int(header.group(2)) if header.group(2) is not None else 1
+            current = {"start": int(header.group(1)), "insert": old_count == 0, "old": [], "new": []}
+            hunks.append(current)
+        elif current is None or raw.startswith("\\"):    # File headers come before the first @@
+            continue
+        elif raw.startswith("-"):
+            current["old"].append(raw[1:])
+        elif raw.startswith("+"):
+            current["new"].append(raw[1:])
+        else:   # Context line (a bare empty line is an empty context line)
+            current["old"].append(raw[1:])
+            current["new"].append(raw[1:])
+    if not hunks:
+        raise EditError("no @@ hunks found in diff")
+
+    stripped = [line.rstrip("\r\n") for line in lines]
+    newline = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+    missing_final_newline = bool(lines) and not lines[-1].endswith("\n")
+    regions = []
+    shift = 0
+    for i, hunk in enumerate(hunks, 1):
+        # "-N,0" inserts after line N; otherwise the hunk starts at line N
+        at = (hunk["start"] if hunk["insert"] else max(hunk["start"] - 1, 0)) + shift
+        old, new = hunk["old"], hunk["new"]
+        if at > len(lines) or stripped[at:at + len(old)] != old:
+            raise EditError(f"hunk {i} context does not match the file at line {hunk['start']}")
+        lines[at:at + len(old)] = [line + newline for line in new]
+        stripped[at:at + len(old)] = new
+        regions.append((at, at + len(new)))
+        shift += len(new) - len(old)
+    for n in range(len(lines) - 1):     # A former last line may now be followed by others
+        if not lines[n].endswith("\n"):
+            lines[n] += newline
+    if missing_final_newline and lines:
+        lines[-1] = lines[-1].rstrip("\r\n")     # Keep a missing final newline
+    return lines, regions
+
+
+def _merge_regions(regions):
+    """Sorts (start, end) line regions and merges those whose shown context would overlap."""
+    merged = []
+    for start, end in sorted(regions):
+        if merged and start - merged[-1][1] <= 2 * CONTEXT_LINES:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def atomic_write(abs_file_path, content):
+    """Writes through a temp file in the same directory and renames it over the target.
+
+    The target usually gets a new inode, which is what lets checkpoints hardlink the
+    previous version instead of copying it. Symlinks are written through to their
+    target, and files with other hardlinks are written in place so every link still
+    shares the new content.
+    """
+    real_path = os.path.realpath(abs_file_path)
+    st = stat_path(real_path)
+    if st and has_other_links(st):
+        with open(real_path, "w", newline="") as f:
+            f.write(content)
+        forget_path(abs_file_path)
+        forget_path(real_path)
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(real_path), prefix=".edit-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(content)
+        os.chmod(tmp_path, stat.S_IMODE(st.st_mode) if st else _get_new_file_mode())
+        os.replace(tmp_path, real_path)
+        forget_path(abs_file_path)
+        forget_path(real_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _show_regions(lines, regions):
+    """Numbered lines of each changed region with a little context."""
+    output = []
+    for start, end in regions:
+        first = max(start - CONTEXT_LINES, 0)
+        last = min(end + CONTEXT_LINES, len(lines))
+        output.append(f"@@ lines {first + 1}-{last} @@")
+        output.extend(f"{n + 1}: {lines[n].rstrip()}" for n in range(first, last))
+    return "\n".join(output)
+
+
+@cache
+def schema_apply_edit():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="apply_edit",
+        description="Edits part of an existing file within the working directory without rewriting it, using search/replace hunks or a unified diff. The file is left untouched if any hunk does not match. Prefer this over write_file for changes to existing files.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="Path to the file to edit, relative to the working directory.",
+                ),
+                "edits": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(
+                        type=types.Type.OBJECT,
+                        properties={
+                            "search": types.Schema(
+                                type=types.Type.STRING,
+                                description="Exact existing text to replace; must occur exactly once in the file.",
+                            ),
+                            "replace": types.Schema(
+                                type=types.Type.STRING,
+                                description="Text to put in its place.",
+                            ),
+                        },
+                        required=["search", "replace"],
+                    ),
+                    description="Search/replace hunks applied in order.",
+                ),
+                "diff": types.Schema(
+                    type=types.Type.STRING,
+                    description="A unified diff of this one file (with @@ hunk headers), used instead of edits.",
+                ),
+            },
+            required=["file_path"],
+        ),
+    )
@@ -0,0 +1,182 @@
+import atexit
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import cache
+from config import CHECKPOINT_DIR
+from functions.path_validator import validate_path, stat_path, link_target
+from functions.run_tests import note_changed
+
+
+_blob_inodes = set()    # (st_dev, st_ino) of tree files that also have a link in a blob store
+_blob_inodes_lock = threading.Lock()
+
+
+def file_digest(abs_path):
+    with open(abs_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def has_other_links(st):
+    """True if the file has hardlinks besides its path and a checkpoint blob, which writes must keep."""
+    with _blob_inodes_lock:
+        held = (st.st_dev, st.st_ino) in _blob_inodes
+    return st.st_nlink - held > 1
+
+
+class CheckpointStore:
+    """Per-turn checkpoints of the files the agent writes under one working directory.
+
+    Checkpoint N holds the state, before turn N's first write to it, of every file
+    turn N changed. Contents live in a content-addressed blob store: identical
+    versions are stored once, and since every agent write replaces the file with a
+    new inode (see atomic_write) the previous version is hardlinked into the store
+    rather than copied. Files with other hardlinks are written in place instead, so
+    their previous version is copied. Writes through a symlink are recorded under
+    the link's target. Reverting only touches the files recorded since the target.
+    """
+
+    def __init__(self, abs_root):
+        self.abs_root = abs_root
+        self.checkpoints = {}   # turn -> {rel_path: (digest, mode) or None if the file did not exist}
+        self.lock = threading.Lock()
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        self.blob_dir = tempfile.mkdtemp(prefix="blobs-", dir=CHECKPOINT_DIR)
+        atexit.register(shutil.rmtree, self.blob_dir, True)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest)
+
+    def _store_blob(self, abs_path, st):
+        digest = file_digest(abs_path)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            try:
+                if st.st_nlink > 1:
+                    raise OSError("written in place, the blob needs its own copy")
+                os.link(abs_path, blob_path)
+                with _blob_inodes_lock:
+                    _blob_inodes.add((st.st_dev, st.st_ino))
+            except OSError:     # Shared inode, different filesystem or no hardlink support
+                shutil.copyfile(abs_path, blob_path + ".tmp")
+                os.replace(blob_path + ".tmp", blob_path)
+        return digest, stat.S_IMODE(st.st_mode)
+
+    def _unshare(self, abs_path, entry):
+        """Copies a blob that still shares its inode with abs_path, e.g. after a failed write."""
+        blob_path = self._blob_path(entry[0])
+        try:
+            if not os.path.samefile(abs_path, blob_path):
+                return
+        except OSError:
+            return
+        shutil.copyfile(blob_path, blob_path + ".tmp")
+        os.replace(blob_path + ".tmp", blob_path)
+
+    @contextmanager
+    def recording(self, abs_path, turn):
+        """Saves abs_path into checkpoint `turn` (once per turn) around a write to it."""
+        abs_path = link_target(self.abs_root, abs_path)
+        rel_path = os.path.relpath(abs_path, self.abs_root).replace(os.sep, "/")
+        with self.lock:
+            checkpoint = self.checkpoints.setdefault(turn, {})
+            entry = checkpoint.get(rel_path, False)
+            st = stat_path(abs_path) if entry is False else None
+            if entry is False and not (st and stat.S_ISDIR(st.st_mode)):
+                entry = checkpoint[rel_path] = self._store_blob(abs_path, st) if st else None
+        try:
+            yield
+        finally:
+            if entry:
+                with self.lock:
+                    self._unshare(abs_path, entry)
+
+    def revert(self, turn):
+        """Restores every file changed at or after checkpoint `turn`; returns [(rel_path, action)]."""
+        with self.lock:
+            later = sorted(t for t in self.checkpoints if t >= turn)
+            targets = {}
+            for t in later:
+                for rel_path, entry in self.checkpoints[t].items():
+                    targets.setdefault(rel_path, entry)     # Earliest state wins
+            restored = []
+            for rel_path, entry in sorted(targets.items()):
+                abs_path = os.path.join(self.abs_root, rel_path)
+                if entry is None:
+                    if os.path.isfile(abs_path):
+                        os.remove(abs_path)
+                        restored.append((rel_path, "deleted"))
+                    continue
+                os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+                st = stat_path(abs_path)
+                if st and has_other_links(st):
+                    shutil.copyfile(self._blob_path(entry[0]), abs_path)   # In place, like the write
+                else:
+                    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(abs_path), prefix=".revert-", suffix=".tmp")
+                    os.close(fd)
+                    try:
+                        shutil.copyfile(self._blob_path(entry[0]), tmp_path)   # Copy so blobs stay immutable
+                        os.chmod(tmp_path, entry[1])
+                        os.replace(tmp_path, abs_path)
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+                restored.append((rel_path, "restored"))
+            for rel_path, _ in restored:
+                note_changed(os.path.join(self.abs_root, rel_path))
+            for t in later:
+                del self.checkpoints[t]
+            return restored
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_checkpoint_store(abs_root):
+    with _stores_lock:
+        if abs_root not in _stores:
+            _stores[abs_root] = CheckpointStore(abs_root)
+        return _stores[abs_root]
+
+
+def revert(working_directory, checkpoint=None):
+    abs_working_dir, _ = validate_path(working_directory, ".")
+    store = get_checkpoint_store(abs_working_dir)
+    with store.lock:
+        available = sorted(store.checkpoints)
+    if not available:
+        return "Error: no checkpoints yet; nothing has been written in this session"
+    checkpoint = available[-1] if checkpoint is None else int(checkpoint)
+    if checkpoint not in available:
+        return f"Error: no checkpoint {checkpoint}; available checkpoints: {', '.join(map(str, available))}"
+    try:
+        restored = store.revert(checkpoint)
+    except Exception as e:
+        return f"Error: reverting to checkpoint {checkpoint}: {e}"
+    if not restored:
+        return f"Reverted to checkpoint {checkpoint}; no files needed changes"
+    details = "\n".join(f"- {rel_path} ({action})" for rel_path, action in restored)
+    return f"Reverted {len(restored)} files to checkpoint {checkpoint}:\n{details}"
+
+
+@cache
+def schema_revert():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="revert",
+        description="Undoes file changes by restoring a checkpoint. Every successful write reports the checkpoint holding the previous version; reverting to it restores all files changed since, including deleting files created since. Much cheaper than rewriting files from memory after a bad edit.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "checkpoint": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Checkpoint number to restore. Defaults to the most recent one, undoing the latest turn's writes.",
+                ),
+            },
+        ),
+    )
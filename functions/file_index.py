@@ -0,0 +1,124 @@
+import fnmatch
+import os
+import threading
+from functions.path_validator import links_outside
+
+# Always skipped, whatever the .gitignore says
+DEFAULT_EXCLUDES = [".git/", "__pycache__/", ".venv/", "venv/", "node_modules/", "*.py[cod]"]
+
+
+class IgnoreRules:
+    """Minimal .gitignore matcher: globs, "/" anchoring, trailing "/" for dirs, "!" negation."""
+
+    def __init__(self, patterns):
+        self.rules = []
+        for line in patterns:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line      # Patterns with a slash match from the root
+            self.rules.append((line.lstrip("/"), negate, dir_only, anchored))
+
+    @classmethod
+    def from_root(cls, abs_root):
+        patterns = list(DEFAULT_EXCLUDES)
+        try:
+            with open(os.path.join(abs_root, ".gitignore")) as f:
+                patterns.extend(f.read().splitlines())
+        except OSError:
+            pass
+        return cls(patterns)
+
+    def ignored(self, rel_path, is_dir):
+        ignored = False
+        name = rel_path.rsplit("/", 1)[-1]
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            target = rel_path if anchored else name
+            if fnmatch.fnmatchcase(target, pattern):
+                ignored = not negate
+        return ignored
+
+
+class FileIndex:
+    """In-process index of a working directory built with os.scandir.
+
+    Each directory's entries are cached with the directory's st_mtime_ns and only
+    rescanned when that changes or when a write invalidates it.
+    """
+
+    def __init__(self, abs_root):
+        self.abs_root = abs_root
+        self.dirs = {}      # abs_dir -> (mtime_ns, [(name, is_dir, size)])
+        self.ignore = IgnoreRules.from_root(abs_root)
+        self.real_root = os.path.realpath(abs_root)
+        self.lock = threading.Lock()
+
+    def entries(self, abs_dir):
+        """Sorted (name, is_dir, size) entries of abs_dir, excluding ignored paths."""
+        mtime_ns = os.stat(abs_dir).st_mtime_ns
+        with self.lock:
+            cached = self.dirs.get(abs_dir)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        rel_dir = os.path.relpath(abs_dir, self.abs_root)
+        entries = []
+        with os.scandir(abs_dir) as it:
+            for entry in it:
+                if links_outside(entry, self.real_root):
+                    continue
+                is_dir = entry.is_dir()
+                rel_path = entry.name if rel_dir == "." else f"{rel_dir}/{entry.name}"
+                if self.ignore.ignored(rel_path.replace(os.sep, "/"), is_dir):
+                    continue
+                size = 0 if is_dir else entry.stat().st_size
+                entries.append((entry.name, is_dir, size))
+        entries.sort(key=lambda e: (not e[1], e[0]))     # Directories first
+        with self.lock:
+            self.dirs[abs_dir] = (mtime_ns, entries)
+        return entries
+
+    def invalidate(self, abs_path):
+        """Forgets the directory holding abs_path; in-place writes keep the dir mtime."""
+        with self.lock:
+            self.dirs.pop(os.path.dirname(abs_path), None)
+            self.dirs.pop(abs_path, None)
+            if os.path.basename(abs_path) == ".gitignore":
+                self.ignore = IgnoreRules.from_root(self.abs_root)
+
+    def clear(self):
+        with self.lock:
+            self.dirs.clear()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_file_index(abs_root):
+    with _indexes_lock:
+        if abs_root not in _indexes:
+            _indexes[abs_root] = FileIndex(abs_root)
+        return _indexes[abs_root]
+
+
+def invalidate_path(abs_path):
+    """Invalidates abs_path in every index that contains it."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if os.path.commonpath([index.abs_root, abs_path]) == index.abs_root:
+            index.invalidate(abs_path)
+
+
+def clear_indexes():
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.clear()
@@ -1,26 +1,110 @@
-import os
-from google.genai import types
-from config import MAX_CHARS    # Configurable safety limit (10000 chars)
-from functions.path_validator import validate_path
-
-
-def get_file_content(working_directory, file_path):
-    # Convert paths to absolute form and validate containment
-    abs_working_dir, result = validate_path(working_directory, file_path)
-    if abs_working_dir is None:
-        return result  # Return error message
-    abs_file_path = result
+import bisect
+import mmap
+import threading
+from collections import OrderedDict
+from functools import cache
+from config import MAX_CHARS, MAX_BATCH_FILES    # Configurable safety limit (10000 chars)
+from functions.path_validator import resolve_path
+
+LINE_INDEX_BLOCK = 64 * 1024    # Bytes per newline-count block in a line index
+LINE_INDEX_CACHE_SIZE = 64      # Files whose line index is kept
+
+
+class LineIndex:
+    """Sparse line-offset index of a file: newline counts per fixed-size block.
+
+    Built with C-speed bytes.count over mmap blocks, so locating line N only scans the
+    one block that contains it instead of the whole file.
+    """
+
+    def __init__(self, mm):
+        self.size = len(mm)
+        self.newlines_before = [0]      # Newlines in mm[:i * LINE_INDEX_BLOCK]
+        for start in range(0, self.size, LINE_INDEX_BLOCK):
+            end = min(start + LINE_INDEX_BLOCK, self.size)
+            self.newlines_before.append(self.newlines_before[-1] + mm[start:end].count(b"\n"))
+        ends_with_newline = self.size and mm[self.size - 1:self.size] == b"\n"
+        self.total_lines = self.newlines_before[-1] + (0 if ends_with_newline or not self.size else 1)
+
+    def line_offset(self, mm, line):
+        """Byte offset where 0-based line starts (file size past the last line)."""
+        if line <= 0:
+            return 0
+        if line > self.newlines_before[-1]:
+            return self.size
+        block = bisect.bisect_left(self.newlines_before, line) - 1
+        pos = block * LINE_INDEX_BLOCK
+        for _ in range(line - self.newlines_before[block]):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+
+
+_line_indexes = OrderedDict()   # abs_file_path -> ((mtime_ns, size), LineIndex)
+_line_indexes_lock = threading.Lock()
+
+
+def _get_line_index(abs_file_path, st, mm):
+    key = (st.st_mtime_ns, st.st_size)
+    with _line_indexes_lock:
+        cached = _line_indexes.get(abs_file_path)
+        if cached and cached[0] == key:
+            _line_indexes.move_to_end(abs_file_path)
+            return cached[1]
+    index = LineIndex(mm)
+    with _line_indexes_lock:
+        _line_indexes[abs_file_path] = (key, index)
+        while len(_line_indexes) > LINE_INDEX_CACHE_SIZE:
+            _line_indexes.popitem(last=False)
+    return index
+
+
+def _read_lines(abs_file_path, st, file_path, offset, limit):
+    """Reads `limit` lines starting at 1-based line `offset` through a memory map."""
+    if st.st_size == 0:
+        return f'[...File "{file_path}" is empty]'
+    with open(abs_file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        index = _get_line_index(abs_file_path, st, mm)
+        first = max(offset, 1) - 1
+        if first >= index.total_lines:
+            return f'[...File "{file_path}" has only {index.total_lines} lines]'
+        last = first + limit if limit else index.total_lines
+        start = index.line_offset(mm, first)
+        end = index.line_offset(mm, last)
+        content = mm[start:min(end, start + MAX_CHARS * 4)].decode(errors="replace")
+    notice = f'[...File "{file_path}" lines {first + 1}-{min(last, index.total_lines)} of {index.total_lines}'
+    if len(content) > MAX_CHARS:
+        content = content[:MAX_CHARS]
+        notice += f", truncated at {MAX_CHARS} characters"
+    return content + notice + "]"
+
+
+def get_file_content(working_directory, file_path, offset=None, limit=None):
+    # Validate the line range before touching the file
+    try:
+        offset = None if offset is None else int(offset)
+        limit = None if limit is None else int(limit)
+    except (TypeError, ValueError):
+        return f"Error: offset and limit must be integers, got {offset!r} and {limit!r}"
+    if offset is not None and offset < 1:
+        return f"Error: offset must be at least 1, got {offset}"
+    if limit is not None and limit < 0:
+        return f"Error: limit must not be negative, got {limit}"
+    # Validate containment and stat the target once
+    path, error = resolve_path(working_directory, file_path)
+    if error:
+        return error  # Return error message
+    abs_file_path = path.abs_path
     # Validate target exists and is a file (not dir/symlink/etc)
-    if not os.path.isfile(abs_file_path):
+    if not path.is_file:
         return f'Error: File not found or is not a regular file: "{file_path}"'
     try:
-        # Check file size before reading
-        file_size = os.path.getsize(abs_file_path)
+        if offset is not None or limit is not None:     # Ranged read via the line index
+            return _read_lines(abs_file_path, path.st, file_path, offset or 1, limit or 0)
         # Read file with size limit
         with open(abs_file_path, "r") as f:
             content = f.read(MAX_CHARS)
             # Add truncation notice if file was larger than limit
-            if file_size > MAX_CHARS:
+            if path.st.st_size > MAX_CHARS:
                 content += (
                     f'[...File "{file_path}" truncated at {MAX_CHARS} characters]'
                 )
@@ -30,17 +114,66 @@ def get_file_content(working_directory, file_path):
         return f'Error reading file "{file_path}": {e}'
 
 
-schema_get_file_content = types.FunctionDeclaration(
-    name="get_file_content",
-    description=f"Reads and returns the first {MAX_CHARS} characters of the content from a specified file within the working directory.",
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "file_path": types.Schema(
-                type=types.Type.STRING,
-                description="The path to the file whose content should be read, relative to the working directory.",
-            ),
-        },
-        required=["file_path"],
-    ),
-)
\ No newline at end of file
+def get_file_contents(working_directory, file_paths, offset=None, limit=None):   # Batch form of get_file_content
+    if not file_paths:
+        return "Error: no file paths given"
+    sections = []
+    for file_path in file_paths[:MAX_BATCH_FILES]:
+        sections.append(f"==> {file_path} <==\n" + get_file_content(working_directory, file_path, offset, limit))
+    if len(file_paths) > MAX_BATCH_FILES:
+        sections.append(f"[...Only the first {MAX_BATCH_FILES} of {len(file_paths)} files were read]")
+    return "\n\n".join(sections)
+
+
+@cache
+def schema_get_file_content():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="get_file_content",
+        description=f"Reads and returns the first {MAX_CHARS} characters of the content from a specified file within the working directory. Pass offset/limit to read a specific line range of a large file instead.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="The path to the file whose content should be read, relative to the working directory.",
+                ),
+                "offset": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional 1-based line number to start reading from.",
+                ),
+                "limit": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional number of lines to read. Reads to the end of the file (up to the character limit) if omitted.",
+                ),
+            },
+            required=["file_path"],
+        ),
+    )
+
+@cache
+def schema_get_file_contents():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="get_file_contents",
+        description=f"Reads several files within the working directory in one call (up to {MAX_BATCH_FILES}), each limited like get_file_content.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_paths": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(type=types.Type.STRING),
+                    description="Paths of the files to read, relative to the working directory.",
+                ),
+                "offset": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional 1-based line number to start reading each file from.",
+                ),
+                "limit": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional number of lines to read from each file.",
+                ),
+            },
+            required=["file_paths"],
+        ),
+    )
@@ -0,0 +1,73 @@
+import fnmatch
+import os
+from functools import cache
+from config import TREE_MAX_ENTRIES
+from functions.path_validator import resolve_path
+from functions.file_index import get_file_index
+
+
+def get_project_tree(working_directory, directory=".", max_depth=3, pattern=None):   # Returns an indented, depth-limited tree with sizes as a string.
+    path, error = resolve_path(working_directory, directory)
+    if error:
+        return error  # Return error message
+    abs_working_dir, target_dir = path.abs_working_dir, path.abs_path
+    if not path.is_dir:
+        return f'Error: "{directory}" is not a directory'
+    try:
+        index = get_file_index(abs_working_dir)
+        lines = []
+        truncated = _walk(index, target_dir, abs_working_dir, int(max_depth), pattern, 0, lines)
+        if truncated:
+            lines.append(f"[...Tree truncated at {TREE_MAX_ENTRIES} entries, narrow it with directory, max_depth or pattern]")
+        return "\n".join(lines) if lines else "No matching files."
+    except Exception as e:
+        return f"Error building project tree: {e}"
+
+
+def _walk(index, abs_dir, abs_working_dir, max_depth, pattern, depth, lines):
+    """Appends tree lines for abs_dir; returns True once TREE_MAX_ENTRIES is hit."""
+    indent = "  " * depth
+    for name, is_dir, size in index.entries(abs_dir):
+        if len(lines) >= TREE_MAX_ENTRIES:
+            return True
+        abs_path = os.path.join(abs_dir, name)
+        if is_dir:
+            mark = len(lines)
+            lines.append(f"{indent}- {name}/")
+            if depth + 1 < max_depth:
+                if _walk(index, abs_path, abs_working_dir, max_depth, pattern, depth + 1, lines):
+                    return True
+            if pattern and len(lines) == mark + 1:  # Nothing matched below this directory
+                lines.pop()
+        else:
+            rel_path = os.path.relpath(abs_path, abs_working_dir).replace(os.sep, "/")
+            if pattern and not (fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern)):
+                continue
+            lines.append(f"{indent}- {name}: file_size={size} bytes")
+    return False
+
+
+@cache
+def schema_get_project_tree():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="get_project_tree",
+        description=f"Returns the recursive file tree of a directory in one call, with file sizes, skipping .gitignore'd paths. Capped at {TREE_MAX_ENTRIES} entries; prefer this over repeated get_files_info calls when exploring.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "directory": types.Schema(
+                    type=types.Type.STRING,
+                    description="The directory to start from, relative to the working directory. Defaults to the working directory itself.",
+                ),
+                "max_depth": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="How many directory levels to descend. Defaults to 3.",
+                ),
+                "pattern": types.Schema(
+                    type=types.Type.STRING,
+                    description="Optional glob (e.g. \"*.py\" or \"pkg/*.py\") that files must match; directories without matches are omitted.",
+                ),
+            },
+        ),
+    )
@@ -0,0 +1,127 @@
+import ast
+import os
+import threading
+from functions.file_index import IgnoreRules
+from functions.path_validator import links_outside
+
+
+def module_candidates(rel_dir, name, level):
+    """Relative file paths an import of `name` from a file in rel_dir could resolve to.
+
+    Absolute imports are tried against the working dir root and the importing file's
+    own directory (which is sys.path[0] when a script is run directly).
+    """
+    parts = name.split(".") if name else []
+    if level:
+        base = rel_dir.split("/") if rel_dir else []
+        base = base[:len(base) - (level - 1)] if level > 1 else base
+        roots = ["/".join(base)]
+    else:
+        roots = ["", rel_dir] if rel_dir else [""]
+    candidates = []
+    for root in roots:
+        stem = "/".join(p for p in [root] + parts if p)
+        if stem:
+            candidates.append(stem + ".py")
+            candidates.append(stem + "/__init__.py")
+        elif level:
+            candidates.append("/".join(p for p in [root, "__init__.py"] if p))
+    return candidates
+
+
+def parse_imports(source, rel_path):
+    """Relative paths of every module the source may import (resolved or not)."""
+    tree = ast.parse(source, filename=rel_path)
+    rel_dir = os.path.dirname(rel_path)
+    targets = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                targets.extend(module_candidates(rel_dir, alias.name, 0))
+        elif isinstance(node, ast.ImportFrom):
+            targets.extend(module_candidates(rel_dir, node.module, node.level))
+            for alias in node.names:    # "from pkg import module" imports a submodule
+                sub = f"{node.module}.{alias.name}" if node.module else alias.name
+                targets.extend(module_candidates(rel_dir, sub, node.level))
+    return targets
+
+
+class ImportGraph:
+    """Import dependency graph of the Python files under a working directory.
+
+    Each file's imports are parsed with ast and cached by mtime/size, so rebuilding
+    after a few writes only re-parses the files that changed.
+    """
+
+    def __init__(self, abs_root):
+        self.abs_root = abs_root
+        self.parsed = {}    # rel_path -> ((mtime_ns, size), [imported rel_paths])
+        self.lock = threading.Lock()
+
+    def python_files(self):
+        ignore = IgnoreRules.from_root(self.abs_root)
+        real_root = os.path.realpath(self.abs_root)
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            with os.scandir(os.path.join(self.abs_root, rel_dir)) as entries:
+                for entry in entries:
+                    if links_outside(entry, real_root):
+                        continue
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    is_dir = entry.is_dir()
+                    if ignore.ignored(rel_path, is_dir):
+                        continue
+                    if is_dir:
+                        stack.append(rel_path)
+                    elif entry.name.endswith(".py"):
+                        yield rel_path, entry.stat()
+
+    def refresh(self):
+        """Returns {rel_path: set of imported rel_paths that exist in the tree}."""
+        with self.lock:
+            files = dict(self.python_files())
+            for rel_path in set(self.parsed) - set(files):
+                del self.parsed[rel_path]
+            for rel_path, st in files.items():
+                key = (st.st_mtime_ns, st.st_size)
+                cached = self.parsed.get(rel_path)
+                if cached and cached[0] == key:
+                    continue
+                try:
+                    with open(os.path.join(self.abs_root, rel_path), "rb") as f:
+                        imports = parse_imports(f.read(), rel_path)
+                except (OSError, SyntaxError, ValueError):
+                    imports = []
+                self.parsed[rel_path] = (key, imports)
+            return {
+                rel_path: {target for target in imports if target in files and target != rel_path}
+                for rel_path, (_, imports) in self.parsed.items()
+            }
+
+    def affected_by(self, changed):
+        """Every file that is in `changed` or transitively imports one of them."""
+        graph = self.refresh()
+        importers = {}
+        for rel_path, imports in graph.items():
+            for target in imports:
+                importers.setdefault(target, set()).add(rel_path)
+        affected = set(changed)
+        stack = list(changed)
+        while stack:
+            for importer in importers.get(stack.pop(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    stack.append(importer)
+        return affected
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def get_import_graph(abs_root):
+    with _graphs_lock:
+        if abs_root not in _graphs:
+            _graphs[abs_root] = ImportGraph(abs_root)
+        return _graphs[abs_root]
@@ -0,0 +1,95 @@
+import subprocess
+import threading
+from collections import namedtuple
+from config import OUTPUT_HEAD_BYTES, OUTPUT_TAIL_BYTES, OUTPUT_KILL_BYTES
+
+READ_CHUNK = 64 * 1024
+
+CapturedOutput = namedtuple("CapturedOutput", ["returncode", "stdout", "stderr", "killed"])
+
+
+class BoundedStream:
+    """Keeps the first head_bytes and the last tail_bytes of a stream, counting the rest."""
+
+    def __init__(self, head_bytes=OUTPUT_HEAD_BYTES, tail_bytes=OUTPUT_TAIL_BYTES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()     # Ring of the most recent output
+        self.total = 0
+
+    def feed(self, chunk):
+        self.total += len(chunk)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.tail_bytes > 0:
+            self.tail += chunk
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[:len(self.tail) - self.tail_bytes]
+
+    @property
+    def dropped(self):
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self):
+        head = self.head.decode(errors="replace")
+        tail = self.tail.decode(errors="replace")
+        if not self.dropped:
+            return head + tail
+        return f"{head}\n[... {self.dropped} bytes truncated ...]\n{tail}"
+
+
+def run_captured(proc, commands, timeout, stdin_data=None):
+    """Waits for a binary-pipe Popen while streaming its output into bounded buffers.
+
+    The process is killed once stdout and stderr together exceed OUTPUT_KILL_BYTES.
+    Raises subprocess.TimeoutExpired(commands, timeout) like subprocess.run does.
+    """
+    streams = {"stdout": BoundedStream(), "stderr": BoundedStream()}
+    killed = threading.Event()
+    lock = threading.Lock()
+
+    def drain(pipe, stream):
+        while True:
+            chunk = pipe.read1(READ_CHUNK)
+            if not chunk:
+                break
+            with lock:
+                stream.feed(chunk)
+                total = streams["stdout"].total + streams["stderr"].total
+            if OUTPUT_KILL_BYTES and total > OUTPUT_KILL_BYTES and not killed.is_set():
+                killed.set()
+                proc.kill()
+        pipe.close()
+
+    readers = [
+        threading.Thread(target=drain, args=(proc.stdout, streams["stdout"]), daemon=True),
+        threading.Thread(target=drain, args=(proc.stderr, streams["stderr"]), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    if proc.stdin:
+        try:
+            if stdin_data:
+                proc.stdin.write(stdin_data)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise subprocess.TimeoutExpired(commands, timeout)
+    finally:
+        for reader in readers:
+            reader.join(timeout=1)     # Orphaned grandchildren may hold the pipes open
+
+    return CapturedOutput(
+        proc.returncode,
+        streams["stdout"].text(),
+        streams["stderr"].text(),
+        killed.is_set(),
+    )
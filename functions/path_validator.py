@@ -1,20 +1,115 @@
 import os
+import stat
+import threading
+from collections import namedtuple
+
+_resolved = {}      # (working_directory, file_path) -> (abs_working_dir, abs_file_path) or (None, error)
+_stats = {}         # abs path -> os.stat_result, or None if it does not exist
+_cache_lock = threading.Lock()
+_memoize = False    # Off until the agent loop calls start_iteration(), so direct tool use is never stale
+
+
+class ResolvedPath(namedtuple("ResolvedPath", ["abs_working_dir", "abs_path", "st"])):
+    """A validated path and the result of its single stat call (None if it does not exist)."""
+    __slots__ = ()
+
+    @property
+    def exists(self):
+        return self.st is not None
+
+    @property
+    def is_file(self):
+        return self.st is not None and stat.S_ISREG(self.st.st_mode)
+
+    @property
+    def is_dir(self):
+        return self.st is not None and stat.S_ISDIR(self.st.st_mode)
 
 
 def validate_path(working_directory, file_path):
     """Validates that file_path is within working_directory.
-    
+
+    Symlinks are resolved before the containment check, so a link inside the working
+    directory that points outside it is rejected. Inside the agent loop results are
+    memoized until the next start_iteration().
+
     Args:
         working_directory: The base working directory
         file_path: The relative file path to validate
-    
+
     Returns:
         tuple: (abs_working_dir, abs_file_path) if valid, or (None, error_message) if invalid
     """
+    key = (working_directory, file_path)
+    cached = _resolved.get(key) if _memoize else None
+    if cached:
+        return cached
     abs_working_dir = os.path.abspath(working_directory)
     abs_file_path = os.path.abspath(os.path.join(abs_working_dir, file_path))
-    
-    if not abs_file_path.startswith(abs_working_dir):
-        return None, f'Error: Cannot access "{file_path}" as it is outside the permitted working directory'
-    
-    return abs_working_dir, abs_file_path
+    real_working_dir = os.path.realpath(abs_working_dir)
+    real_file_path = os.path.realpath(abs_file_path)
+    if os.path.commonpath([real_working_dir, real_file_path]) != real_working_dir:
+        result = None, f'Error: Cannot access "{file_path}" as it is outside the permitted working directory'
+    else:
+        result = abs_working_dir, abs_file_path
+    if _memoize:
+        with _cache_lock:
+            _resolved[key] = result
+    return result
+
+
+def stat_path(abs_path):
+    """os.stat(abs_path), or None if it does not exist, memoized like validate_path."""
+    if _memoize and abs_path in _stats:
+        return _stats[abs_path]
+    try:
+        st = os.stat(abs_path)
+    except (FileNotFoundError, NotADirectoryError):
+        st = None
+    if _memoize:
+        with _cache_lock:
+            _stats[abs_path] = st
+    return st
+
+
+def resolve_path(working_directory, file_path):
+    """validate_path plus one stat of the target; returns (ResolvedPath, None) or (None, error_message)."""
+    abs_working_dir, result = validate_path(working_directory, file_path)
+    if abs_working_dir is None:
+        return None, result
+    return ResolvedPath(abs_working_dir, result, stat_path(result)), None
+
+
+def link_target(abs_working_dir, abs_path):
+    """abs_path with symlinks resolved, expressed under abs_working_dir (validate_path keeps it inside)."""
+    real_path = os.path.realpath(abs_path)
+    if real_path == abs_path:
+        return abs_path
+    return os.path.join(abs_working_dir, os.path.relpath(real_path, os.path.realpath(abs_working_dir)))
+
+
+def links_outside(entry, real_root):
+    """True for a scandir entry that is a symlink resolving outside real_root; walks skip these."""
+    if not entry.is_symlink():
+        return False
+    return os.path.commonpath([real_root, os.path.realpath(entry.path)]) != real_root
+
+
+def forget_path(abs_path):
+    """Drops the memoized stat of a path that was just written."""
+    with _cache_lock:
+        _stats.pop(abs_path, None)
+
+
+def clear_path_cache():
+    """Forgets every memoized lookup, e.g. after a script that may have changed any file."""
+    with _cache_lock:
+        _resolved.clear()
+        _stats.clear()
+
+
+def start_iteration():
+    """Called by the agent loop before each model turn; anything may have changed on disk since the last one."""
+    global _memoize
+    _memoize = True
+    clear_path_cache()
@@ -0,0 +1,103 @@
+import atexit
+import json
+import subprocess
+import sys
+import threading
+from collections import deque
+from functions.output_capture import run_captured
+
+# Bootstrap run by every pre-started interpreter. It blocks until a job arrives on stdin,
+# then runs the script as __main__ the way "python file.py args" would and exits, so each
+# job gets a clean interpreter that has already paid its startup cost.
+_WORKER_BOOTSTRAP = r"""
+import json, os, sys, types, traceback
+job = json.loads(sys.stdin.readline())
+sys.stdin = open(os.devnull)
+path = job["file"]
+sys.argv = [path] + job["args"]
+sys.path[0] = os.path.dirname(path)
+module = types.ModuleType("__main__")
+module.__file__ = path
+module.__builtins__ = __builtins__
+sys.modules["__main__"] = module
+try:
+    with open(path, "rb") as f:
+        code = compile(f.read(), path, "exec")
+    exec(code, module.__dict__)
+except SystemExit:
+    raise
+except BaseException as e:
+    traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    sys.exit(1)
+"""
+
+
+class PythonWorkerPool:
+    """Keeps `size` idle interpreters pre-started per working directory.
+
+    Workers run with cwd locked to their working directory and are used for a single
+    job, then replaced in the background, so no state leaks between runs.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = {}      # abs_working_dir -> deque of Popen
+        self.lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _spawn(self, abs_working_dir):
+        return subprocess.Popen(
+            [sys.executable, "-c", _WORKER_BOOTSTRAP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=abs_working_dir,
+        )
+
+    def _refill(self, abs_working_dir):
+        with self.lock:
+            workers = self.idle.setdefault(abs_working_dir, deque())
+            while len(workers) < self.size:
+                workers.append(self._spawn(abs_working_dir))
+
+    def _acquire(self, abs_working_dir):
+        with self.lock:
+            workers = self.idle.setdefault(abs_working_dir, deque())
+            while workers:
+                worker = workers.popleft()
+                if worker.poll() is None:   # Still waiting for a job
+                    break
+            else:
+                worker = None
+        if worker is None:
+            worker = self._spawn(abs_working_dir)
+        threading.Thread(target=self._refill, args=(abs_working_dir,), daemon=True).start()
+        return worker
+
+    def run(self, abs_working_dir, abs_file_path, args, timeout):
+        """Runs the script in a warm worker; returns output_capture.CapturedOutput.
+
+        Raises subprocess.TimeoutExpired like subprocess.run does.
+        """
+        commands = [sys.executable, abs_file_path] + list(args or [])
+        worker = self._acquire(abs_working_dir)
+        job = json.dumps({"file": abs_file_path, "args": list(args or [])}) + "\n"
+        return run_captured(worker, commands, timeout, stdin_data=job.encode())
+
+    def shutdown(self):
+        with self.lock:
+            workers = [w for queue in self.idle.values() for w in queue]
+            self.idle.clear()
+        for worker in workers:
+            worker.kill()
+            worker.communicate()
+
+
+_pool = None
+
+
+def get_worker_pool(size):
+    global _pool
+    if _pool is None:
+        _pool = PythonWorkerPool(size)
+    return _pool
@@ -1,8 +1,12 @@
 import os
 import sys
 import subprocess
-from google.genai import types
-from functions.path_validator import validate_path
+from functools import cache
+from functions.path_validator import resolve_path
+from functions.python_worker_pool import get_worker_pool
+from functions.output_capture import run_captured
+from config import PYTHON_WORKERS, OUTPUT_KILL_BYTES
+from profiling import tracer
 
 
 """Execute Python file with security constraints and return output.
@@ -18,12 +22,12 @@ Returns:
 
 def run_python_file(working_directory, file_path, args=None):
     # SECURITY: Resolve absolute paths and validate containment
-    abs_working_dir, result = validate_path(working_directory, file_path)
-    if abs_working_dir is None:
-        return result  # Return error message
-    abs_file_path = result
+    path, error = resolve_path(working_directory, file_path)
+    if error:
+        return error  # Return error message
+    abs_working_dir, abs_file_path = path.abs_working_dir, path.abs_path
     # Validate file existence and type
-    if not os.path.exists(abs_file_path):
+    if not path.exists:
         return f'Error: File "{file_path}" not found.'
     if not file_path.endswith(".py"):
         return f'Error: "{file_path}" is not a Python file.'
@@ -32,14 +36,24 @@ def run_python_file(working_directory, file_path, args=None):
         commands = [sys.executable, abs_file_path]
         if args:
             commands.extend(args)   # Add any additional arguments
-        # SAFE EXECUTION: Critical security parameters
-        result = subprocess.run(
-            commands,
-            capture_output=True,    # Prevent direct console output
-            text=True,              # Get strings instead of bytes
-            timeout=30,             # Prevent infinite execution
-            cwd=abs_working_dir,    # Contain execution to working dir
-        )
+        with tracer.span(os.path.basename(file_path), "subprocess") as span:
+            if PYTHON_WORKERS > 0:  # Warm interpreter from the pool, same limits
+                try:
+                    result = get_worker_pool(PYTHON_WORKERS).run(abs_working_dir, abs_file_path, args, timeout=30)
+                except OSError:     # Pool unavailable, fall back to a one-shot subprocess
+                    result = None
+            else:
+                result = None
+            if result is None:
+                # SAFE EXECUTION: Critical security parameters
+                process = subprocess.Popen(
+                    commands,
+                    stdout=subprocess.PIPE,     # Prevent direct console output
+                    stderr=subprocess.PIPE,     # Streamed into bounded head/tail buffers
+                    cwd=abs_working_dir,        # Contain execution to working dir
+                )
+                result = run_captured(process, commands, timeout=30)   # Prevent infinite execution
+            span["returncode"] = result.returncode
         # Format multi-part output
         output = []
         if result.stdout:
@@ -47,7 +61,9 @@ def run_python_file(working_directory, file_path, args=None):
         if result.stderr:
             output.append(f"STDERR:\n{result.stderr}")
 
-        if result.returncode != 0:
+        if result.killed:
+            output.append(f"Process killed after producing more than {OUTPUT_KILL_BYTES} bytes of output")
+        elif result.returncode != 0:
             output.append(f"Process exited with code {result.returncode}")
 
         return "\n".join(output) if output else "No output produced."
@@ -55,25 +71,28 @@ def run_python_file(working_directory, file_path, args=None):
         return f"Error: executing Python file: {e}"
 
 
-schema_run_python_file = types.FunctionDeclaration(
-    name="run_python_file",
-    description="Executes a Python file within the working directory and returns the output from the interpreter.",
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "file_path": types.Schema(
-                type=types.Type.STRING,
-                description="Path to the Python file to execute, relative to the working directory.",
-            ),
-            "args": types.Schema(
-                type=types.Type.ARRAY,
-                items=types.Schema(
+@cache
+def schema_run_python_file():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="run_python_file",
+        description="Executes a Python file within the working directory and returns the output from the interpreter.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
                     type=types.Type.STRING,
+                    description="Path to the Python file to execute, relative to the working directory.",
+                ),
+                "args": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(
+                        type=types.Type.STRING,
+                        description="Optional arguments to pass to the Python file.",
+                    ),
                     description="Optional arguments to pass to the Python file.",
                 ),
-                description="Optional arguments to pass to the Python file.",
-            ),
-        },
-        required=["file_path"],
-    ),
-)
\ No newline at end of file
+            },
+            required=["file_path"],
+        ),
+    )
\ No newline at end of file
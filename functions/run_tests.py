@@ -0,0 +1,148 @@
+import ast
+import fnmatch
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from config import TEST_TIMEOUT, TEST_WORKERS
+from functions.path_validator import resolve_path
+from functions.import_graph import get_import_graph
+from functions.output_capture import run_captured
+
+TEST_FILE_PATTERNS = ("test_*.py", "*_test.py", "tests.py")
+FAILURE_LINES = 6   # Trailing output lines kept per failing test
+
+_changed_paths = {}         # Absolute path -> sequence number of its latest write
+_last_run = {}              # Absolute test directory -> sequence number when it was last run
+_sequence = 0
+_state_lock = threading.Lock()
+
+
+def note_changed(abs_path):
+    """Called for every file the agent writes, so the next run can select affected tests."""
+    global _sequence
+    with _state_lock:
+        _sequence += 1
+        _changed_paths[abs_path] = _sequence
+
+
+def discover_test_ids(source, module):
+    """unittest ids (module.Class.test_x) and module-level test functions in a test file."""
+    tree = ast.parse(source)
+    ids = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name.startswith("test"):
+                    ids.append(("unittest", f"{module}.{node.name}.{item.name}"))
+        elif isinstance(node, ast.FunctionDef) and node.name.startswith("test"):
+            ids.append(("function", f"{module}.{node.name}"))
+    return ids
+
+
+def _run_one(abs_working_dir, abs_test_dir, kind, test_id):
+    """Runs one test case in its own interpreter; returns (status, detail).
+
+    It runs from the test file's directory with the working dir also on PYTHONPATH,
+    so tests in subdirectories can import the project's packages.
+    """
+    if kind == "unittest":
+        commands = [sys.executable, "-m", "unittest", "-q", test_id]
+    else:
+        module, function = test_id.rsplit(".", 1)
+        commands = [sys.executable, "-c", f"import {module}; {module}.{function}()"]
+    python_path = [abs_working_dir] + ([os.environ["PYTHONPATH"]] if os.environ.get("PYTHONPATH") else [])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(python_path))
+    process = subprocess.Popen(commands, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=abs_test_dir, env=env)
+    try:
+        result = run_captured(process, commands, timeout=TEST_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return "TIMEOUT", f"exceeded {TEST_TIMEOUT}s"
+    if result.returncode == 0:
+        return "PASS", ""
+    lines = [line for line in (result.stderr or result.stdout).splitlines() if line.strip()]
+    if result.returncode == 5 and lines and "skipped=" in lines[-1]:    # unittest 3.12+: every test skipped
+        return "SKIP", lines[-1]
+    return "FAIL", "\n    ".join(lines[-FAILURE_LINES:])
+
+
+def run_tests(working_directory, directory=".", changed_only=True):
+    path, error = resolve_path(working_directory, directory)
+    if error:
+        return error  # Return error message
+    abs_working_dir, result = path.abs_working_dir, path.abs_path
+    if not path.is_dir:
+        return f'Error: "{directory}" is not a directory'
+    try:
+        graph = get_import_graph(abs_working_dir)
+        prefix = os.path.relpath(result, abs_working_dir).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        with _state_lock:     # Each test directory tracks its own runs, so a run of one never hides changes from another
+            last_run = _last_run.get(result)
+            mine = {p for p, seq in _changed_paths.items()
+                    if last_run is not None and seq > last_run
+                    and os.path.commonpath([abs_working_dir, p]) == abs_working_dir}
+            full_run = not changed_only or last_run is None
+            _last_run[result] = _sequence
+        changed = {os.path.relpath(p, abs_working_dir).replace(os.sep, "/") for p in mine}
+
+        test_files = sorted(
+            rel_path for rel_path in graph.refresh()
+            if rel_path.startswith(prefix)
+            and any(fnmatch.fnmatch(os.path.basename(rel_path), pat) for pat in TEST_FILE_PATTERNS)
+        )
+        if not full_run:
+            affected = graph.affected_by(changed)
+            test_files = [t for t in test_files if t in affected]
+            if not test_files:
+                return "No tests affected by the files changed since the last run."
+
+        jobs = []
+        for rel_path in test_files:
+            abs_path = os.path.join(abs_working_dir, rel_path)
+            with open(abs_path, "rb") as f:
+                ids = discover_test_ids(f.read(), os.path.basename(rel_path)[:-3])
+            jobs.extend((os.path.dirname(abs_path), rel_path, kind, test_id) for kind, test_id in ids)
+        if not jobs:
+            return "No tests found."
+
+        with ThreadPoolExecutor(max_workers=TEST_WORKERS) as executor:
+            outcomes = list(executor.map(lambda job: _run_one(abs_working_dir, job[0], job[2], job[3]), jobs))
+
+        counts = {}
+        lines = []
+        for (_, rel_path, _, test_id), (status, detail) in zip(jobs, outcomes):
+            counts[status] = counts.get(status, 0) + 1
+            if status != "PASS":
+                lines.append(f"{status} {rel_path}::{test_id}\n    {detail}")
+        scope = "all" if full_run else f"affected by {', '.join(sorted(changed))}"
+        summary = ", ".join(f"{n} {s.lower()}" for s, n in sorted(counts.items()))
+        # No wall time: the result enters the history, which must stay deterministic for
+        # the response cache (the tracer's run_tests span has the timing)
+        return "\n".join([f"Ran {len(jobs)} tests ({scope}): {summary}"] + lines)
+    except Exception as e:
+        return f"Error running tests: {e}"
+
+
+@cache
+def schema_run_tests():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="run_tests",
+        description="Runs the project's test cases in parallel and returns a compact pass/fail summary. After the first run it only runs tests that import (directly or transitively) files you changed since the previous run_tests call. Prefer this over run_python_file on test files.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "directory": types.Schema(
+                    type=types.Type.STRING,
+                    description="Optional directory to limit test discovery to, relative to the working directory.",
+                ),
+                "changed_only": types.Schema(
+                    type=types.Type.BOOLEAN,
+                    description="Set to false to run every test regardless of what changed. Defaults to true.",
+                ),
+            },
+        ),
+    )
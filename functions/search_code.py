@@ -0,0 +1,69 @@
+import os
+import re
+from functools import cache
+from config import SEARCH_MAX_RESULTS
+from functions.path_validator import validate_path, stat_path
+from functions.trigram_index import get_trigram_index, required_literals, read_text
+
+SNIPPET_CHARS = 200
+
+
+def search_code(working_directory, query, regex=False, directory="."):   # Returns "path:line: snippet" matches as a string.
+    abs_working_dir, result = validate_path(working_directory, directory)
+    if abs_working_dir is None:
+        return result  # Return error message
+    if not query:
+        return "Error: empty search query"
+    try:
+        compiled = re.compile(query if regex else re.escape(query))
+    except re.error as e:
+        return f'Error: invalid regular expression "{query}": {e}'
+    try:
+        index = get_trigram_index(abs_working_dir)
+        prefix = os.path.relpath(result, abs_working_dir).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        matches = []
+        for rel_path in index.candidates(required_literals(query, regex)):
+            if not rel_path.startswith(prefix):
+                continue
+            abs_path = os.path.join(abs_working_dir, rel_path)
+            st = stat_path(abs_path)
+            text = read_text(abs_path, st.st_size) if st else None
+            if text is None or not compiled.search(text):
+                continue
+            for line_no, line in enumerate(text.splitlines(), 1):
+                if compiled.search(line):
+                    matches.append(f"{rel_path}:{line_no}: {line.strip()[:SNIPPET_CHARS]}")
+                    if len(matches) >= SEARCH_MAX_RESULTS:
+                        matches.append(f"[...Search stopped at {SEARCH_MAX_RESULTS} matches, refine the query]")
+                        return "\n".join(matches)
+        return "\n".join(matches) if matches else f'No matches for "{query}".'
+    except Exception as e:
+        return f"Error searching code: {e}"
+
+
+@cache
+def schema_search_code():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="search_code",
+        description=f"Searches the text files in the working directory for a literal string or regular expression and returns up to {SEARCH_MAX_RESULTS} matches as path:line: snippet. Use it to find symbols instead of reading files one by one.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "query": types.Schema(
+                    type=types.Type.STRING,
+                    description="The text or regular expression to search for.",
+                ),
+                "regex": types.Schema(
+                    type=types.Type.BOOLEAN,
+                    description="Treat the query as a Python regular expression. Defaults to a literal search.",
+                ),
+                "directory": types.Schema(
+                    type=types.Type.STRING,
+                    description="Optional directory to limit the search to, relative to the working directory.",
+                ),
+            },
+            required=["query"],
+        ),
+    )
@@ -0,0 +1,228 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+from config import INDEX_CACHE_DIR, SEARCH_MAX_FILE_BYTES
+from functions.file_index import IgnoreRules
+from functions.path_validator import links_outside
+
+try:    # Python 3.11+ exposes the regex parser as re._parser
+    from re import _parser as sre_parse
+except ImportError:     # pragma: no cover - older interpreters
+    import sre_parse
+
+INDEX_VERSION = 1
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(query, regex):
+    """Substrings every match must contain; used to pick candidate files."""
+    if not regex:
+        return [query]
+    try:
+        parsed = sre_parse.parse(query)
+    except re.error:
+        return []
+    literals, current = [], []
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if current:
+            literals.append("".join(current))
+            current = []
+        if op is sre_parse.BRANCH:      # Alternation at top level: nothing is required
+            return []
+    if current:
+        literals.append("".join(current))
+    return literals
+
+
+class TrigramIndex:
+    """Trigram index of the text files under a working directory.
+
+    Built lazily on first search, persisted under INDEX_CACHE_DIR between runs and
+    refreshed by mtime/size. Within a session only paths reported by write_file are
+    re-indexed until something (e.g. run_python_file) marks the whole tree stale.
+    """
+
+    def __init__(self, abs_root):
+        self.abs_root = abs_root
+        self.files = {}         # rel_path -> (mtime_ns, size, frozenset of trigrams)
+        self.postings = {}      # trigram -> set of rel_paths
+        self.fresh = False      # Whole tree checked since the last mark_stale()
+        self.dirty = set()      # rel_paths written since the last refresh
+        self.lock = threading.Lock()
+        digest = hashlib.sha1(abs_root.encode()).hexdigest()[:16]
+        self.cache_path = os.path.join(INDEX_CACHE_DIR, f"trigrams-{digest}.pickle")
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.abs_root:
+            return
+        for rel_path, entry in data["files"].items():
+            self._add(rel_path, entry)
+
+    def _save(self):
+        try:
+            os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"version": INDEX_VERSION, "root": self.abs_root, "files": self.files},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass    # Persisting is an optimization only
+
+    def _add(self, rel_path, entry):
+        self.files[rel_path] = entry
+        for trigram in entry[2]:
+            self.postings.setdefault(trigram, set()).add(rel_path)
+
+    def _remove(self, rel_path):
+        entry = self.files.pop(rel_path, None)
+        if entry:
+            for trigram in entry[2]:
+                paths = self.postings.get(trigram)
+                if paths:
+                    paths.discard(rel_path)
+                    if not paths:
+                        del self.postings[trigram]
+
+    def _index_file(self, rel_path):
+        """(Re)indexes one file if its mtime/size changed; returns True if the index changed."""
+        abs_path = os.path.join(self.abs_root, rel_path)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            changed = rel_path in self.files
+            self._remove(rel_path)
+            return changed
+        cached = self.files.get(rel_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return False
+        self._remove(rel_path)
+        text = read_text(abs_path, st.st_size)
+        if text is not None:
+            self._add(rel_path, (st.st_mtime_ns, st.st_size, frozenset(trigrams(text))))
+        return True
+
+    def _walk(self):
+        ignore = IgnoreRules.from_root(self.abs_root)
+        real_root = os.path.realpath(self.abs_root)
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                with os.scandir(os.path.join(self.abs_root, rel_dir)) as entries:
+                    for entry in entries:
+                        if links_outside(entry, real_root):
+                            continue
+                        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        is_dir = entry.is_dir()
+                        if ignore.ignored(rel_path, is_dir):
+                            continue
+                        if is_dir:
+                            stack.append(rel_path)
+                        elif entry.is_file():
+                            yield rel_path
+            except OSError:
+                continue
+
+    def refresh(self):
+        with self.lock:
+            changed = False
+            if not self.fresh:
+                seen = set()
+                for rel_path in self._walk():
+                    seen.add(rel_path)
+                    changed |= self._index_file(rel_path)
+                for rel_path in set(self.files) - seen:
+                    self._remove(rel_path)
+                    changed = True
+                self.fresh = True
+            else:
+                for rel_path in self.dirty:
+                    changed |= self._index_file(rel_path)
+            self.dirty.clear()
+            if changed:
+                self._save()
+
+    def update_path(self, abs_path):
+        rel_path = os.path.relpath(abs_path, self.abs_root).replace(os.sep, "/")
+        with self.lock:
+            self.dirty.add(rel_path)
+
+    def mark_stale(self):
+        with self.lock:
+            self.fresh = False
+
+    def candidates(self, literals):
+        """Sorted rel_paths that may contain every literal."""
+        self.refresh()
+        with self.lock:
+            result = None
+            for literal in literals:
+                for trigram in trigrams(literal):
+                    paths = self.postings.get(trigram, set())
+                    result = set(paths) if result is None else result & paths
+            if result is None:      # No usable trigrams, scan everything
+                result = set(self.files)
+        return sorted(result)
+
+
+def read_text(abs_path, size):
+    """File contents as text, or None for binary or oversized files."""
+    if size > SEARCH_MAX_FILE_BYTES:
+        return None
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+    return data.decode(errors="replace")
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_trigram_index(abs_root):
+    with _indexes_lock:
+        if abs_root not in _indexes:
+            _indexes[abs_root] = TrigramIndex(abs_root)
+        return _indexes[abs_root]
+
+
+def update_search_path(abs_path):
+    """Queues abs_path for re-indexing in every loaded index that contains it."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if os.path.commonpath([index.abs_root, abs_path]) == index.abs_root:
+            index.update_path(abs_path)
+
+
+def forget_indexes():
+    """Drops every in-memory index; the next search reloads from disk."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def mark_search_stale():
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.mark_stale()
@@ -1,26 +1,27 @@
 import os
-from google.genai import types
-from functions.path_validator import validate_path
+from functools import cache
+from functions.path_validator import resolve_path, clear_path_cache
+from functions.apply_edit import atomic_write
 
 def write_file(working_directory, file_path, content):
-    # Convert paths to absolute form and validate containment
-    abs_working_dir, result = validate_path(working_directory, file_path)
-    if abs_working_dir is None:
-        return result  # Return error message
-    abs_file_path = result
+    # Validate containment and stat the target once
+    path, error = resolve_path(working_directory, file_path)
+    if error:
+        return error  # Return error message
+    abs_file_path = path.abs_path
+    # Prevent accidentally writing to directories
+    if path.is_dir:
+        return f'Error: "{file_path}" is a directory, not a file'
     # Create parent directories if needed (for new files)
-    if not os.path.exists(abs_file_path):
+    if not path.exists:
         try:
             os.makedirs(os.path.dirname(abs_file_path), exist_ok=True)
+            clear_path_cache()  # New directories invalidate memoized lookups
         except Exception as e:
             return f"Error: creating directory: {e}"
-    # Prevent accidentally writing to directories
-    if os.path.exists(abs_file_path) and os.path.isdir(abs_file_path):
-        return f'Error: "{file_path}" is a directory, not a file'
     try:
-        # Perform the file write operation
-        with open(abs_file_path, "w") as f:
-            f.write(content)
+        # Replace the file atomically so readers never see a partial write
+        atomic_write(abs_file_path, content)
         return (
             f'Successfully wrote to "{file_path}" ({len(content)} characters written)'
         )
@@ -28,21 +29,24 @@ def write_file(working_directory, file_path, content):
         return f"Error: writing to file: {e}"
 
 
-schema_write_file = types.FunctionDeclaration(
-    name="write_file",
-    description="Writes content to a file within the working directory. Creates the file if it doesn't exist.",
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "file_path": types.Schema(
-                type=types.Type.STRING,
-                description="Path to the file to write, relative to the working directory.",
-            ),
-            "content": types.Schema(
-                type=types.Type.STRING,
-                description="Content to write to the file",
-            ),
-        },
-        required=["file_path", "content"],
-    ),
-)
\ No newline at end of file
+@cache
+def schema_write_file():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="write_file",
+        description="Writes content to a file within the working directory. Creates the file if it doesn't exist.",
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="Path to the file to write, relative to the working directory.",
+                ),
+                "content": types.Schema(
+                    type=types.Type.STRING,
+                    description="Content to write to the file",
+                ),
+            },
+            required=["file_path", "content"],
+        ),
+    )
\ No newline at end of file
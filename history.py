@@ -0,0 +1,210 @@
+import os
+from config import HISTORY_TOKEN_BUDGET, HISTORY_KEEP_TURNS
+
+SUMMARY_PREVIEW_CHARS = 120     # Leading characters kept in a compacted result
+
+
+class HistoryManager:
+    """Keeps the prompt sent on every iteration within a token budget.
+
+    Per-turn cost is tracked from response.usage_metadata. Repeated reads of the same
+    file always collapse to the latest one; once the last prompt exceeds the budget,
+    tool results and write_file/apply_edit payloads older than the last `keep_turns`
+    tool turns are replaced by short summaries. The latest read of any path the recent
+    turns still mention is never compacted. A re-read sent as a delta (see
+    output_compression.elide_unchanged) keeps the full read it refers to alive.
+    """
+
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, keep_turns=HISTORY_KEEP_TURNS):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.prompt_tokens = []     # prompt_token_count of every model call
+        self.turn_costs = []        # Tokens each turn added to the prompt
+        self.response_tokens = []   # candidates_token_count of every model call
+        self.compacted = 0          # Parts summarized so far
+        self.sent_reads = {}        # read key -> (fingerprint, turn) of the full copy in history
+        self.sent_texts = {}        # read key -> (turn, text) of the last full read, base of deltas
+
+    def record_usage(self, usage_metadata):
+        if not usage_metadata or usage_metadata.prompt_token_count is None:
+            return
+        prompt_tokens = usage_metadata.prompt_token_count
+        previous = self.prompt_tokens[-1] if self.prompt_tokens else 0
+        self.prompt_tokens.append(prompt_tokens)
+        self.turn_costs.append(prompt_tokens - previous)
+        self.response_tokens.append(usage_metadata.candidates_token_count or 0)
+
+    def note_read(self, args, read_fingerprint):
+        """Returns the turn an identical read was already sent in, else records this one."""
+        key = read_key(args)
+        sent = self.sent_reads.get(key)
+        if sent and sent[0] == read_fingerprint:
+            return sent[1]
+        self.sent_reads[key] = (read_fingerprint, len(self.prompt_tokens))
+        return None
+
+    def last_sent_text(self, args):
+        return self.sent_texts.get(read_key(args))
+
+    def note_sent_text(self, args, text):
+        self.sent_texts[read_key(args)] = (len(self.prompt_tokens), text)
+
+    def over_budget(self):
+        return bool(self.prompt_tokens) and self.prompt_tokens[-1] > self.token_budget
+
+    def compact(self, messages):
+        """Rewrites old entries of messages in place; returns the number of parts changed."""
+        from google.genai import types
+        calls = pair_calls_with_results(messages)
+        tool_turns = sorted({msg_idx for msg_idx, _, _, _ in calls})
+        recent_turns = set(tool_turns[-self.keep_turns:]) if self.keep_turns else set()
+        referenced = _referenced_text(messages, recent_turns)
+
+        changed = 0
+        latest_read = {}    # read key -> (msg_idx, part_idx) of its newest full read
+        latest_delta = {}   # read key -> (msg_idx, part_idx) of the newest delta on top of it
+        for msg_idx, part_idx, name, args in calls:
+            response = messages[msg_idx].parts[part_idx].function_response.response or {}
+            if _is_compacted(response):
+                continue    # Neither a full read nor a delta any more
+            if name == "get_file_content" and "file_path" in args and "unchanged_since_turn" not in response:
+                if "delta_of_turn" in response:
+                    latest_delta[read_key(args)] = (msg_idx, part_idx)
+                else:
+                    latest_read[read_key(args)] = (msg_idx, part_idx)
+                    latest_delta.pop(read_key(args), None)
+        live_reads = set(latest_read.values()) | set(latest_delta.values())
+
+        compact_old = self.over_budget()
+        for msg_idx, part_idx, name, args in calls:
+            part = messages[msg_idx].parts[part_idx]
+            response = part.function_response.response or {}
+            if _is_compacted(response):
+                continue
+            file_path = args.get("file_path")
+            is_read = name == "get_file_content" and "unchanged_since_turn" not in response
+            if is_read and file_path and (msg_idx, part_idx) not in live_reads:
+                summary = f'[superseded by a later read of "{file_path}"]'
+            elif compact_old and msg_idx not in recent_turns:
+                if is_read and file_path and file_path in referenced:
+                    continue    # Latest copy of a file the recent turns still use
+                if is_read and file_path:
+                    self.sent_reads.pop(read_key(args), None)  # Full copy is gone
+                    if "delta_of_turn" not in response:
+                        self.sent_texts.pop(read_key(args), None)
+                summary = _summarize(name, args, response)
+            else:
+                continue
+            messages[msg_idx].parts[part_idx] = types.Part.from_function_response(
+                name=name, response={"result": summary, "compacted": True}
+            )
+            changed += 1
+
+        if compact_old:
+            changed += _compact_write_payloads(messages, recent_turns)
+        self.compacted += changed
+        return changed
+
+
+def read_key(args):
+    """Identifies a get_file_content read: the same file and line range."""
+    return os.path.normpath(args["file_path"]), args.get("offset"), args.get("limit")
+
+
+def pair_calls_with_results(messages):
+    """Returns (msg_idx, part_idx, name, args) for every function response in messages.
+
+    Tool contents answer the function_call parts of the model content right before them,
+    in the same order.
+    """
+    pairs = []
+    pending_calls = []
+    for msg_idx, content in enumerate(messages):
+        parts = content.parts or []
+        if content.role == "model":
+            pending_calls = [p.function_call for p in parts if p.function_call]
+        elif content.role == "tool":
+            for part_idx, part in enumerate(parts):
+                if not part.function_response:
+                    continue
+                call = pending_calls[part_idx] if part_idx < len(pending_calls) else None
+                args = dict(call.args or {}) if call else {}
+                pairs.append((msg_idx, part_idx, part.function_response.name, args))
+            pending_calls = []
+    return pairs
+
+
+def _referenced_text(messages, recent_turns):
+    """Text and call arguments of the recent turns, used to spot paths still in use."""
+    first_recent = min(recent_turns) - 1 if recent_turns else len(messages)
+    chunks = []
+    for content in messages[max(first_recent, 0):]:
+        if content.role != "model":
+            continue
+        for part in content.parts or []:
+            if part.text:
+                chunks.append(part.text)
+            if part.function_call:
+                chunks.extend(str(v) for v in (part.function_call.args or {}).values())
+    return " ".join(chunks)
+
+
+def _is_compacted(response):
+    return isinstance(response, dict) and response.get("compacted")
+
+
+def _summarize(name, args, response):
+    result = str(response.get("result", response.get("error", "")))
+    preview = result[:SUMMARY_PREVIEW_CHARS].replace("\n", " | ")
+    arg_text = ", ".join(f"{k}={v!r}" for k, v in args.items() if k != "content")
+    return f"[compacted {name}({arg_text}): {len(result)} chars, began: {preview}]"
+
+
+def _compact_write_payloads(messages, recent_turns):
+    """Drops the payloads of old write_file and apply_edit calls; the file itself holds them."""
+    from google.genai import types
+    changed = 0
+    first_recent = min(recent_turns) - 1 if recent_turns else len(messages)
+    for content in messages[:first_recent]:
+        if content.role != "model":
+            continue
+        for part_idx, part in enumerate(content.parts or []):
+            call = part.function_call
+            args = _compacted_payload_args(call) if call else None
+            if args is None:
+                continue
+            content.parts[part_idx] = types.Part(
+                function_call=types.FunctionCall(id=call.id, name=call.name, args=args)
+            )
+            changed += 1
+    return changed
+
+
+def _compacted_payload_args(call):
+    """Args of a write call with its payloads summarized, or None if nothing is left to compact."""
+    def summary(value, what):
+        if not isinstance(value, str) or value.startswith("[compacted"):
+            return None
+        return f"[compacted: {len(value)} chars {what}]"
+
+    args = dict(call.args or {})
+    changed = False
+    if call.name == "write_file":
+        new = summary(args.get("content"), "written")
+        if new:
+            args["content"], changed = new, True
+    elif call.name == "apply_edit":
+        new = summary(args.get("diff"), "of diff")
+        if new:
+            args["diff"], changed = new, True
+        edits = []
+        for edit in args.get("edits") or []:
+            edit = dict(edit)
+            for key, what in (("search", "searched"), ("replace", "replaced")):
+                new = summary(edit.get(key), what)
+                if new:
+                    edit[key], changed = new, True
+            edits.append(edit)
+        if edits:
+            args["edits"] = edits
+    return args if changed else None
@@ -1,31 +1,46 @@
 import sys
 import os
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 from prompts import system_prompt
-from call_function import call_function, available_functions
-from config import MAX_ITERS
+from call_function import call_function, available_functions, READ_ONLY_FUNCTIONS
+from functions.path_validator import start_iteration
+from history import HistoryManager
+from prefetch import prefetching
+from tool_cache import tool_cache
+from profiling import tracer, trace_path_from_argv
+from config import MAX_ITERS, MAX_TOOL_WORKERS, MODEL_NAME, WORKING_DIR
 
 
 def main():
-    # Loads environment variables from .env file (where API key is stored)
-    load_dotenv()
-
     # New verbose flag detection (before processing args)
     verbose = "--verbose" in sys.argv   # Checks if --verbose is anywhere in args
+    stream = "--stream" in sys.argv     # Async loop with streamed responses
+    trace_path = trace_path_from_argv(sys.argv)     # --trace=run.json or --trace=run.jsonl
+    tracer.enabled = trace_path is not None
     args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]  # Excludes all flag-style arguments
 
     if not args:
         print("AI Code Assistant")
-        print('\nUsage: python main.py "your prompt here" [--verbose]')
+        print('\nUsage: python main.py "your prompt here" [--verbose] [--stream] [--trace=FILE]')
         print('Example: python main.py "How do I fix the calculator?"')
         sys.exit(1)  
-    
+
+    # The SDK takes most of startup, so it is only imported once a model call is certain
+    import asyncio
+    from google import genai
+    from google.genai import types
+    from dotenv import load_dotenv
+    from async_agent import run_agent_async
+    from rate_limit import RateLimitedClient
+    from response_cache import wrap_client
+
+    # Loads environment variables from .env file (where API key is stored)
+    load_dotenv()
     # Retrieves the secret API key from environment variables
     api_key = os.environ.get("GEMINI_API_KEY")
-    # Initializes the Gemini client with your API key
-    client = genai.Client(api_key=api_key)
+    # Initializes the Gemini client with your API key, retries and rate limits included.
+    # AI_RESPONSE_CACHE=record/replay serves repeated requests from disk instead.
+    client = wrap_client(lambda: RateLimitedClient(genai.Client(api_key=api_key)))
 
     user_prompt = " ".join(args)
 
@@ -42,36 +57,62 @@ def main():
         parts=[types.Part(text=user_prompt)]),    # Actual content payload
     ]
 
-    # Pass the structured messages to our generation handler
-    iters = 0
-    while True:     # NEW: Continuous agent loop
-        iters += 1
-        if iters > MAX_ITERS:       # Safety limit
-            print(f"Maximum iterations ({MAX_ITERS}) reached.")
-            sys.exit(1)
+    history = HistoryManager()      # Keeps prompt tokens per iteration bounded
 
+    if stream:      # Tools start while the response is still streaming in
+        final_response = asyncio.run(run_agent_async(client, messages, verbose, history))
+    else:
+        final_response = run_agent(client, messages, verbose, history)
+    if trace_path:
+        tracer.write(trace_path)
+        print(tracer.summary())
+    if not final_response:      # Safety limit hit
+        print(f"Maximum iterations ({MAX_ITERS}) reached.")
+        sys.exit(1)
+
+    if not stream:      # Streamed text is already on screen
+        print("Final response:")
+        print(final_response)
+    if verbose:
+        print(tool_cache.stats())
+
+
+# Continuous agent loop; returns the final response, or None after MAX_ITERS
+def run_agent(client, messages, verbose, history=None, working_directory=WORKING_DIR):
+    # Pass the structured messages to our generation handler
+    for iteration in range(1, MAX_ITERS + 1):
         try:
-            final_response = generate_content(client, messages, verbose)
+            with tracer.span("iteration", "iteration", iteration=iteration):
+                final_response = generate_content(client, messages, verbose, history, working_directory)
             if final_response:      # Termination condition
-                print("Final response:")
-                print(final_response)
-                break
+                return final_response
         except Exception as e:      # Error handling
             print(f"Error in generate_content: {e}")
+    return None
 
 # Handles the actual Gemini API request with proper error boundaries
-def generate_content(client, messages, verbose):
-    # Make the actual API call
-    response = client.models.generate_content(
-        model="gemini-2.0-flash-001",   # Fast/cheap model for prototyping
-        contents=messages,              # Our formatted conversation history
-        config=types.GenerateContentConfig(
-            tools=[available_functions], system_instruction=system_prompt    # Force AI behavior
-        ),
-    )
+def generate_content(client, messages, verbose, history=None, working_directory=WORKING_DIR):
+    from google.genai import types
+    start_iteration()       # Path lookups are memoized within one turn
+    # Make the actual API call, reading likely-next files in the background meanwhile
+    with tracer.span("generate_content", "model") as span, prefetching(messages, working_directory):
+        response = client.models.generate_content(
+            model=MODEL_NAME,               # Fast/cheap model for prototyping
+            contents=messages,              # Our formatted conversation history
+            config=types.GenerateContentConfig(
+                tools=[available_functions()], system_instruction=system_prompt    # Force AI behavior
+            ),
+        )
+        if response.usage_metadata:
+            span["prompt_tokens"] = response.usage_metadata.prompt_token_count
+            span["response_tokens"] = response.usage_metadata.candidates_token_count
     if verbose:     # New token counters
         print("Prompt tokens:", response.usage_metadata.prompt_token_count)
         print("Response tokens:", response.usage_metadata.candidates_token_count)
+    if history:
+        history.record_usage(response.usage_metadata)
+        if history.prompt_tokens:
+            tracer.counter("history_tokens", tokens=history.prompt_tokens[-1])
 
     # Conversation history management
     if response.candidates:
@@ -85,9 +126,7 @@ def generate_content(client, messages, verbose):
     
     # Tool response handling
     function_responses = []
-    for function_call_part in response.function_calls:
-        # Call the function handler
-        function_call_result = call_function(function_call_part, verbose)
+    for function_call_result in dispatch_function_calls(response.function_calls, verbose, history, working_directory):
         # Validate response structure
         if (
             not function_call_result.parts
@@ -107,6 +146,34 @@ def generate_content(client, messages, verbose):
         role="tool",
         parts=function_responses
     ))
+    if history:
+        with tracer.span("compact", "history") as span:
+            compacted = span["compacted"] = history.compact(messages)
+        if verbose and compacted:
+            print(f"History compacted: {compacted} entries summarized")
+
+# Runs one turn's function calls, returning results in the original call order
+def dispatch_function_calls(function_calls, verbose, history=None, working_directory=WORKING_DIR):
+    if MAX_TOOL_WORKERS <= 1 or len(function_calls) <= 1:    # Nothing to overlap
+        return [call_function(part, verbose, history, working_directory) for part in function_calls]
+
+    results = [None] * len(function_calls)
+    pending = []    # Indices of consecutive read-only calls waiting to run
+    with ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS) as executor:
+        def flush():
+            futures = [(i, executor.submit(call_function, function_calls[i], verbose, history, working_directory)) for i in pending]
+            for i, future in futures:
+                results[i] = future.result()
+            pending.clear()
+
+        for i, function_call_part in enumerate(function_calls):
+            if function_call_part.name in READ_ONLY_FUNCTIONS:
+                pending.append(i)
+            else:   # Writes and executions act as barriers and keep their order
+                flush()
+                results[i] = call_function(function_call_part, verbose, history, working_directory)
+        flush()
+    return results
 
 if __name__ == "__main__":
     main()  # Standard Python entry point
\ No newline at end of file
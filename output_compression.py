@@ -0,0 +1,190 @@
+import difflib
+import re
+from config import TOOL_OUTPUT_BUDGET, TOOL_OUTPUT_BUDGETS, LISTING_MAX_ENTRIES
+
+FRAME_LINE = re.compile(r'^\s*File ".*", line \d+, in ')
+LISTING_LINE = re.compile(r"^- .*: file_size=(\d+) bytes, is_dir=(True|False)$")
+MAX_FRAME_CYCLE = 4         # Longest run of frames recognized as a repeating cycle
+MIN_FRAME_REPEATS = 3       # Cycles repeated fewer times are left alone
+DELTA_CONTEXT_LINES = 2     # Unchanged lines shown around each changed region of a re-read
+DELTA_MAX_RATIO = 0.6       # Only send a delta if it is at most this fraction of the full read
+
+_compressors = []   # (tool names, or None for every tool, function) in the order they run
+
+
+class OutputContext:
+    """What a compressor may look at besides the result: the call and the session history.
+
+    Compressors can add keys to `extra`; they are merged into the function response.
+    """
+
+    def __init__(self, function_name, args, history=None):
+        self.function_name = function_name
+        self.args = args
+        self.history = history
+        self.extra = {}
+
+
+def register_compressor(tools=None):
+    """Decorator adding compressor(result, context) -> result to the pipeline for `tools`."""
+    def decorator(compressor):
+        _compressors.append((frozenset(tools) if tools else None, compressor))
+        return compressor
+    return decorator
+
+
+def compress_output(function_name, args, result, history=None):
+    """Runs a tool result through every matching compressor; returns (result, extra response keys)."""
+    context = OutputContext(function_name, args, history)
+    for tools, compressor in _compressors:
+        if tools is None or function_name in tools:
+            result = compressor(result, context)
+    return result, context.extra
+
+
+@register_compressor(tools=("run_python_file", "run_tests"))
+def collapse_tracebacks(result, context):
+    """Collapses recursion cycles of frames and drops tracebacks identical to an earlier one."""
+    if "Traceback" not in result and "File \"" not in result:
+        return result
+    lines = _collapse_frame_cycles(result.split("\n"))
+    output = []
+    seen = set()
+    i = 0
+    while i < len(lines):
+        if lines[i].strip() != "Traceback (most recent call last):":
+            output.append(lines[i])
+            i += 1
+            continue
+        end = i + 1
+        while end < len(lines) and lines[end][:1].isspace():    # Frames and code lines are indented
+            end += 1
+        block = tuple(lines[i:end + 1])     # Through the exception line
+        if block in seen:
+            output.append("[Traceback identical to an earlier one omitted]")
+        else:
+            seen.add(block)
+            output.extend(block)
+        i = end + 1
+    return "\n".join(output)
+
+
+def _collapse_frame_cycles(lines):
+    """Groups lines into frames (File line plus its source and caret lines) and collapses repeating cycles."""
+    items = []
+    for line in lines:
+        if FRAME_LINE.match(line):
+            items.append([line])
+        elif items and isinstance(items[-1], list) and line.startswith("    "):
+            items[-1].append(line)      # Source or ^^^ line of the frame above
+        else:
+            items.append(line)
+    items = [tuple(item) if isinstance(item, list) else item for item in items]
+
+    output = []
+    i = 0
+    while i < len(items):
+        best = None     # (period, repeats)
+        for period in range(1, MAX_FRAME_CYCLE + 1):
+            cycle = items[i:i + period]
+            if len(cycle) < period or not all(isinstance(item, tuple) for item in cycle):
+                break
+            repeats = 1
+            while items[i + repeats * period:i + (repeats + 1) * period] == cycle:
+                repeats += 1
+            if repeats >= MIN_FRAME_REPEATS and (not best or repeats * period > best[0] * best[1]):
+                best = (period, repeats)
+        if not best:
+            item = items[i]
+            output.extend(item if isinstance(item, tuple) else [item])
+            i += 1
+            continue
+        period, repeats = best
+        for item in items[i:i + period]:
+            output.extend(item)
+        output.append(f"  [Previous {period} frame{'s' if period > 1 else ''} repeated {repeats - 1} more times]")
+        i += period * repeats
+    return output
+
+
+@register_compressor(tools=("get_files_info",))
+def summarize_listing(result, context):
+    """Keeps the first LISTING_MAX_ENTRIES entries (directories first) and summarizes the rest."""
+    lines = result.split("\n")
+    if len(lines) <= LISTING_MAX_ENTRIES or not all(LISTING_LINE.match(line) for line in lines):
+        return result
+    lines.sort(key=lambda line: not line.endswith("is_dir=True"))
+    omitted = [LISTING_LINE.match(line).groups() for line in lines[LISTING_MAX_ENTRIES:]]
+    dirs = sum(1 for _, is_dir in omitted if is_dir == "True")
+    total = sum(int(size) for size, _ in omitted)
+    summary = (
+        f"[...{len(omitted)} more entries: {dirs} directories, {len(omitted) - dirs} files, "
+        f"{total} bytes; use get_project_tree with a pattern to narrow the listing]"
+    )
+    return "\n".join(lines[:LISTING_MAX_ENTRIES] + [summary])
+
+
+@register_compressor(tools=("get_file_content",))
+def elide_unchanged(result, context):
+    """Sends only the changed regions of a file the model already holds an earlier copy of."""
+    history = context.history
+    if not history or result.startswith("Error"):
+        return result
+    sent = history.last_sent_text(context.args)
+    if sent and sent[1] != result:
+        delta = _delta(sent[1], result, context.args, sent[0])
+        if len(delta) <= len(result) * DELTA_MAX_RATIO:
+            context.extra["delta_of_turn"] = sent[0]
+            return delta
+    history.note_sent_text(context.args, result)
+    return result
+
+
+def _lines(text):
+    """Lines of text as numbered in the file: a final newline does not start another line."""
+    lines = text.split("\n")
+    return lines[:-1] if text.endswith("\n") else lines
+
+
+def _delta(old, new, args, turn):
+    old_lines = _lines(old)
+    new_lines = _lines(new)
+    first_line = int(args.get("offset") or 1)
+    ctx = DELTA_CONTEXT_LINES
+    output = [f'[File "{args["file_path"]}" changed since the read in turn {turn}; only changed lines are shown with their line numbers]']
+    shown = 0   # Index into new_lines up to which output is complete
+    opcodes = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            continue
+        start = max(j1 - ctx, shown)
+        if start > shown:
+            output.append(f"[lines {first_line + shown}-{first_line + start - 1} unchanged]")
+        end = min(j2 + ctx, len(new_lines))
+        if i2 > i1 and j2 == j1:
+            output.extend(f"{first_line + n}: {new_lines[n]}" for n in range(start, j1))
+            output.append(f"[{i2 - i1} line{'s' if i2 - i1 > 1 else ''} removed here]")
+            output.extend(f"{first_line + n}: {new_lines[n]}" for n in range(j1, end))
+        else:
+            output.extend(f"{first_line + n}: {new_lines[n]}" for n in range(start, end))
+        shown = max(shown, end)
+    if shown < len(new_lines):
+        output.append(f"[lines {first_line + shown}-{first_line + len(new_lines) - 1} unchanged]")
+    return "\n".join(output)
+
+
+@register_compressor()
+def enforce_budget(result, context):
+    """Cuts the middle out of results over the tool's byte budget, keeping head and tail."""
+    budget = TOOL_OUTPUT_BUDGETS.get(context.function_name, TOOL_OUTPUT_BUDGET)
+    data = result.encode()
+    if budget <= 0 or len(data) <= budget:
+        return result
+    head = budget * 2 // 3
+    tail = budget - head
+    omitted = len(data) - head - tail
+    return (
+        data[:head].decode(errors="ignore")
+        + f"\n[...{omitted} bytes omitted to fit the {budget}-byte output budget of {context.function_name}...]\n"
+        + data[-tail:].decode(errors="ignore")
+    )
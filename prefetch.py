@@ -0,0 +1,141 @@
+import os
+import re
+import stat
+import threading
+from contextlib import contextmanager
+from config import PREFETCH_MAX_BYTES, PREFETCH_MAX_FILES
+from functions.get_file_content import get_file_content
+from functions.import_graph import parse_imports
+from functions.path_validator import validate_path, stat_path
+from history import pair_calls_with_results
+from output_compression import LISTING_LINE
+from profiling import tracer
+from tool_cache import tool_cache
+
+TRACEBACK_FILE = re.compile(r'^\s*File "([^"]+)", line \d+')
+TREE_LINE = re.compile(r"^( *)- (.+?)(/|: file_size=\d+ bytes)$")
+
+
+def likely_next_files(messages, abs_working_dir):
+    """Relative paths the model will probably read next, most likely first.
+
+    Looks at the latest tool turn only: files in tracebacks of run_python_file and
+    run_tests (innermost frame first), then modules imported by files just read, then
+    files just listed. Only existing files inside abs_working_dir are returned.
+    """
+    calls = pair_calls_with_results(messages)
+    last_turn = calls[-1][0] if calls else None
+    tracebacks, imports, listed = [], [], []
+    for msg_idx, part_idx, name, args in calls:
+        if msg_idx != last_turn:
+            continue
+        response = messages[msg_idx].parts[part_idx].function_response.response or {}
+        result = str(response.get("result", ""))
+        if name in ("run_python_file", "run_tests"):
+            frames = [m.group(1) for m in map(TRACEBACK_FILE.match, result.split("\n")) if m]
+            tracebacks.extend(reversed(frames))
+        elif name in ("get_file_content", "get_file_contents"):
+            paths = args.get("file_paths") or [args.get("file_path")]
+            for file_path in paths:
+                if file_path and file_path.endswith(".py"):
+                    imports.extend(_imports_of(abs_working_dir, file_path))
+        elif name == "get_files_info" and not result.startswith("Error"):
+            directory = args.get("directory", ".")
+            for match in map(LISTING_LINE.match, result.split("\n")):
+                if match and match.group(2) == "False":
+                    listed.append(os.path.join(directory, match.group(0)[2:].split(": file_size=")[0]))
+        elif name == "get_project_tree" and not result.startswith("Error"):
+            listed.extend(_tree_files(result, args.get("directory", ".")))
+
+    seen = set()
+    ordered = []
+    for path in tracebacks + imports + listed:
+        abs_path = os.path.normpath(os.path.join(abs_working_dir, path))
+        if os.path.commonpath([abs_working_dir, abs_path]) != abs_working_dir or abs_path in seen:
+            continue
+        seen.add(abs_path)
+        st = stat_path(abs_path)    # Import candidates include modules that do not exist
+        if not st or not stat.S_ISREG(st.st_mode):
+            continue
+        ordered.append(os.path.relpath(abs_path, abs_working_dir).replace(os.sep, "/"))
+    return ordered
+
+
+def _imports_of(abs_working_dir, file_path):
+    abs_working_dir, abs_file_path = validate_path(abs_working_dir, file_path)
+    if abs_working_dir is None:
+        return []
+    rel_path = os.path.relpath(abs_file_path, abs_working_dir).replace(os.sep, "/")
+    try:
+        with open(abs_file_path, "rb") as f:
+            return parse_imports(f.read(), rel_path)
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+
+def _tree_files(result, directory):
+    """File paths of a get_project_tree result, rebuilt from its indentation."""
+    stack = [directory]     # Directory at each depth
+    files = []
+    for line in result.split("\n"):
+        match = TREE_LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(1)) // 2
+        del stack[depth + 1:]
+        path = os.path.join(stack[depth], match.group(2))
+        if match.group(3) == "/":
+            stack.append(path)
+        else:
+            files.append(path)
+    return files
+
+
+class PrefetchRun:
+    """One background pass reading likely-next files into the tool cache."""
+
+    def __init__(self, messages, working_directory, max_bytes, max_files):
+        self.messages = list(messages)      # The loop appends to the original while we read
+        self.working_directory = working_directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+
+    def _run(self):
+        with tracer.span("prefetch", "prefetch") as span:
+            abs_working_dir = os.path.abspath(self.working_directory)
+            tool_cache.drop_prefetched()
+            files = fetched = 0
+            for file_path in likely_next_files(self.messages, abs_working_dir)[:self.max_files]:
+                if self.stopped.is_set():
+                    break
+                args = {"working_directory": self.working_directory, "file_path": file_path}
+                added = tool_cache.prefetch("get_file_content", args, get_file_content, self.max_bytes)
+                files += 1 if added else 0
+                fetched += added
+            span["files"] = files
+            span["bytes"] = fetched
+
+    def stop(self):
+        """Abandons the files not read yet and waits for the current one; safe to call twice."""
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+
+@contextmanager
+def prefetching(messages, working_directory, max_bytes=PREFETCH_MAX_BYTES, max_files=PREFETCH_MAX_FILES):
+    """Prefetches likely-next files while the block (a model call) runs; yields the run.
+
+    The run is stopped before the block exits, so tools never race with it.
+    """
+    if max_bytes <= 0 or max_files <= 0 or not messages:
+        yield None
+        return
+    run = PrefetchRun(messages, working_directory, max_bytes, max_files)
+    run.thread.start()
+    try:
+        yield run
+    finally:
+        run.stop()
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Tracer:
+    """Collects timed spans and counters for one process, off until `enabled` is set.
+
+    Spans use the Chrome trace event format ("X" complete events, "C" counters), so a
+    .json trace opens directly in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Times the block; the yielded dict becomes the span's args and can be filled in."""
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            self._add({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self.origin) * 1e6),
+                "dur": round((end - start) * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def counter(self, name, **values):
+        if not self.enabled:
+            return
+        self._add({
+            "name": name,
+            "ph": "C",
+            "ts": round((time.perf_counter() - self.origin) * 1e6),
+            "pid": os.getpid(),
+            "args": values,
+        })
+
+    def _add(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def write(self, path):
+        """Writes a Chrome trace for .json paths, one event per line otherwise."""
+        with self.lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            if path.endswith(".json"):
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+            else:
+                for event in events:
+                    f.write(json.dumps(event, default=str) + "\n")
+
+    def summary(self):
+        """Per-function table of calls, wall time, output bytes and cache hits."""
+        rows = {}
+        with self.lock:
+            spans = [e for e in self.events if e["ph"] == "X" and e["cat"] != "iteration"]
+        for event in spans:
+            row = rows.setdefault((event["cat"], event["name"]), [0, 0, 0, 0, 0])
+            row[0] += 1
+            row[1] += event["dur"]
+            row[2] = max(row[2], event["dur"])
+            row[3] += event["args"].get("output_bytes", 0)
+            row[4] += 1 if event["args"].get("cache_hit") else 0
+        lines = [f"{'category':<11}{'name':<20}{'calls':>6}{'total s':>10}{'mean ms':>10}{'max ms':>10}{'bytes':>10}{'hits':>6}"]
+        for (category, name), (calls, total, peak, size, hits) in sorted(rows.items(), key=lambda r: -r[1][1]):
+            lines.append(
+                f"{category:<11}{name:<20}{calls:>6}{total / 1e6:>10.3f}{total / calls / 1e3:>10.1f}"
+                f"{peak / 1e3:>10.1f}{size:>10}{hits:>6}"
+            )
+        return "\n".join(lines)
+
+
+def trace_path_from_argv(argv):
+    """Value of a --trace=PATH flag, or None."""
+    for arg in argv:
+        if arg.startswith("--trace="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+tracer = Tracer()
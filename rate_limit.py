@@ -0,0 +1,214 @@
+import asyncio
+import random
+import re
+import threading
+import time
+import httpx
+from google.genai import errors
+from config import (
+    RATE_LIMIT_RPM,
+    RATE_LIMIT_TPM,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+RETRYABLE_CODES = {408, 429}    # Plus every 5xx
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` tokens per minute.
+
+    A per_minute of 0 disables limiting.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """Blocks until `amount` tokens (at most the bucket capacity) can be taken."""
+        if self.capacity <= 0:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def debit(self, amount):
+        """Corrects an earlier estimate; the bucket may go negative and delay later callers."""
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class RateLimiter:
+    """Requests/min and tokens/min buckets shared by every session in the process."""
+
+    def __init__(self, requests_per_minute=RATE_LIMIT_RPM, tokens_per_minute=RATE_LIMIT_TPM,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.requests = TokenBucket(requests_per_minute, clock, sleep)
+        self.tokens = TokenBucket(tokens_per_minute, clock, sleep)
+
+    def acquire(self, estimated_tokens):
+        self.requests.acquire(1)
+        self.tokens.acquire(estimated_tokens)
+
+
+def is_retryable(error):
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_CODES or (error.code or 0) >= 500
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def retry_after(error):
+    """Server-suggested wait in seconds from a Retry-After header or a RetryInfo detail."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    match = re.search(r"'retryDelay': '([\d.]+)s'", str(getattr(error, "details", "")))
+    return float(match.group(1)) if match else None
+
+
+def backoff_delay(attempt, error=None, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY, rng=random):
+    """Full-jitter exponential backoff, never shorter than the server's retry hint."""
+    delay = rng.uniform(0, min(cap, base * 2 ** attempt))
+    hint = retry_after(error) if error is not None else None
+    return max(delay, hint) if hint else delay
+
+
+def estimate_tokens(contents):
+    """Rough prompt size (4 characters per token) used before the real count is known."""
+    chars = 0
+    for content in contents or []:
+        for part in getattr(content, "parts", None) or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(str(part.function_call.args))
+            elif part.function_response:
+                chars += len(str(part.function_response.response))
+    return chars // 4 + 1
+
+
+class RateLimitedModels:
+    def __init__(self, models, limiter, max_attempts=RETRY_MAX_ATTEMPTS, sleep=time.sleep, rng=random):
+        self._models = models
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+        self.rng = rng
+        self.retries = 0
+
+    def generate_content(self, **kwargs):
+        estimate = estimate_tokens(kwargs.get("contents"))
+        for attempt in range(self.max_attempts):
+            self.limiter.acquire(estimate)
+            try:
+                response = self._models.generate_content(**kwargs)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                self.retries += 1
+                self.sleep(backoff_delay(attempt, e, rng=self.rng))
+                continue
+            usage = response.usage_metadata
+            if usage and usage.total_token_count:
+                self.limiter.tokens.debit(usage.total_token_count - estimate)
+            return response
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class RateLimitedAsyncModels:
+    """Async counterpart of RateLimitedModels for client.aio.models.generate_content_stream.
+
+    A stream is retried until its first chunk arrives; after that chunks (and the
+    tool calls they start) have been handed to the caller, so later errors are raised.
+    """
+
+    def __init__(self, models, limiter, max_attempts=RETRY_MAX_ATTEMPTS, sleep=asyncio.sleep, rng=random):
+        self._models = models
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+        self.rng = rng
+        self.retries = 0
+
+    async def generate_content_stream(self, **kwargs):
+        estimate = estimate_tokens(kwargs.get("contents"))
+        for attempt in range(self.max_attempts):
+            await asyncio.to_thread(self.limiter.acquire, estimate)    # Buckets block with a plain sleep
+            try:
+                stream = await self._models.generate_content_stream(**kwargs)
+                first = await anext(stream, None)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                self.retries += 1
+                await self.sleep(backoff_delay(attempt, e, rng=self.rng))
+                continue
+            return self._relay(first, stream, estimate)
+
+    async def _relay(self, first, stream, estimate):
+        usage = None
+        if first is not None:
+            usage = first.usage_metadata
+            yield first
+            async for chunk in stream:
+                usage = chunk.usage_metadata or usage
+                yield chunk
+        if usage and usage.total_token_count:
+            self.limiter.tokens.debit(usage.total_token_count - estimate)
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class RateLimitedAsyncClient:
+    def __init__(self, models):
+        self.models = models
+
+
+class RateLimitedClient:
+    """Wraps a Gemini client (or a local fake with .models.generate_content).
+
+    Calls wait on the shared limiter and transient failures (429, 5xx, timeouts) are
+    retried here with jittered backoff, so they never use up agent iterations. The
+    streaming calls under client.aio get the same treatment (async_sleep is their
+    sleep).
+    """
+
+    def __init__(self, client, limiter=None, max_attempts=RETRY_MAX_ATTEMPTS, sleep=time.sleep,
+                 async_sleep=asyncio.sleep, rng=random):
+        limiter = limiter or shared_limiter
+        self.models = RateLimitedModels(client.models, limiter, max_attempts, sleep, rng)
+        aio = getattr(client, "aio", None)
+        self.aio = aio and RateLimitedAsyncClient(
+            RateLimitedAsyncModels(aio.models, limiter, max_attempts, async_sleep, rng)
+        )
+
+
+shared_limiter = RateLimiter()
@@ -0,0 +1,192 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from google.genai import types
+from config import RESPONSE_CACHE_MODE, RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_BYTES
+
+MODES = ("off", "record", "replay")
+
+
+class ResponseCacheMiss(Exception):
+    pass
+
+
+def request_key(model, contents, config, stream=False):
+    """Stable hash of everything that determines a model response (streamed ones hash apart).
+
+    Tool results are part of the contents, so replay only matches while every tool
+    result of the session is reproducible: output of scripts that print times, random
+    values or absolute temp paths changes the key and ends in ResponseCacheMiss.
+    """
+    def dump(value):
+        if value is None:
+            return None
+        if hasattr(value, "model_dump"):
+            return value.model_dump(mode="json", exclude_none=True)
+        return [dump(v) for v in value] if isinstance(value, list) else value
+
+    payload = {"model": model, "contents": dump(contents)}
+    if config is not None:
+        payload["system_instruction"] = dump(config.system_instruction)
+        payload["tools"] = dump(config.tools)
+    if stream:
+        payload["stream"] = True
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of generate_content responses, one gzipped JSON file per request hash.
+
+    A streamed response is stored as one JSON line per chunk.
+
+    Evicts least recently used entries (by mtime, refreshed on every hit) once the
+    directory grows past max_bytes.
+    """
+
+    def __init__(self, directory=RESPONSE_CACHE_DIR, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def get(self, key):
+        chunks = self.get_stream(key)
+        return chunks[0] if chunks else None
+
+    def get_stream(self, key):
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt") as f:
+                chunks = [types.GenerateContentResponse.model_validate_json(line) for line in f if line.strip()]
+            os.utime(path)      # Mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return chunks
+
+    def put(self, key, response):
+        self.put_stream(key, [response])
+
+    def put_stream(self, key, chunks):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(key) + ".tmp"
+        with gzip.open(tmp_path, "wt") as f:
+            f.write("\n".join(chunk.model_dump_json(exclude_none=True) for chunk in chunks))
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        with self.lock:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json.gz"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+
+class CachedModels:
+    def __init__(self, models, cache, mode):
+        self._models = models
+        self.cache = cache
+        self.mode = mode
+
+    def generate_content(self, *, model, contents, config=None):
+        key = request_key(model, contents, config)
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        if self.mode == "replay":
+            raise ResponseCacheMiss(f"no recorded response for request {key[:12]}")
+        response = self._models.generate_content(model=model, contents=contents, config=config)
+        self.cache.put(key, response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class CachedAsyncModels:
+    """Streaming counterpart of CachedModels; only streams that finished are recorded."""
+
+    def __init__(self, models, cache, mode):
+        self._models = models
+        self.cache = cache
+        self.mode = mode
+
+    async def generate_content_stream(self, *, model, contents, config=None):
+        key = request_key(model, contents, config, stream=True)
+        chunks = self.cache.get_stream(key)
+        if chunks is not None:
+            return _replay(chunks)
+        if self.mode == "replay":
+            raise ResponseCacheMiss(f"no recorded stream for request {key[:12]}")
+        stream = await self._models.generate_content_stream(model=model, contents=contents, config=config)
+        return self._record(key, stream)
+
+    async def _record(self, key, stream):
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        self.cache.put_stream(key, chunks)
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+async def _replay(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class CachedAsyncClient:
+    def __init__(self, models):
+        self.models = models
+
+
+class CachedClient:
+    """Serves generate_content, and client.aio's generate_content_stream, from a ResponseCache.
+
+    "record" answers from the cache and records misses; "replay" never calls the
+    API (client may be None) and raises ResponseCacheMiss instead.
+    """
+
+    def __init__(self, client, cache=None, mode="record"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unsupported response cache mode: {mode}")
+        self.cache = cache or ResponseCache()
+        self.models = CachedModels(client.models if client else None, self.cache, mode)
+        aio = getattr(client, "aio", None)
+        if aio or mode == "replay":
+            self.aio = CachedAsyncClient(CachedAsyncModels(aio.models if aio else None, self.cache, mode))
+        else:
+            self.aio = None
+
+
+def wrap_client(make_client, mode=RESPONSE_CACHE_MODE):
+    """Applies the configured cache mode; make_client is only called if the API may be used."""
+    if mode not in MODES:
+        raise ValueError(f"AI_RESPONSE_CACHE must be one of {', '.join(MODES)}, got {mode!r}")
+    if mode == "off":
+        return make_client()
+    if mode == "replay":
+        return CachedClient(None, mode="replay")
+    return CachedClient(make_client(), mode="record")
@@ -0,0 +1,87 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from functions.apply_edit import apply_edit, atomic_write
+
+
+class TestApplyEdit(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def edit(self, content, **kwargs):
+        path = os.path.join(self.tmp.name, "f.txt")
+        with open(path, "w", newline="") as f:
+            f.write(content)
+        result = apply_edit(self.tmp.name, "f.txt", **kwargs)
+        with open(path, newline="") as f:
+            return result, f.read()
+
+    def test_diff_insertion_goes_after_the_line(self):
+        result, content = self.edit("a\nb\n", diff="@@ -1,0 +2,1 @@\n+between")
+        self.assertTrue(result.startswith("Successfully"), result)
+        self.assertEqual(content, "a\nbetween\nb\n")
+
+    def test_diff_insertion_at_top(self):
+        _, content = self.edit("a\nb\n", diff="@@ -0,0 +1,1 @@\n+first")
+        self.assertEqual(content, "first\na\nb\n")
+
+    def test_diff_removes_dash_only_lines(self):
+        diff = "--- a/f.txt\n+++ b/f.txt\n@@ -1,3 +1,2 @@\n Title\n---------\n body"
+        result, content = self.edit("Title\n--------\nbody\n", diff=diff)
+        self.assertTrue(result.startswith("Successfully"), result)
+        self.assertEqual(content, "Title\nbody\n")
+
+    def test_diff_hunks_shift_later_hunks(self):
+        original = "".join(f"{n}\n" for n in range(1, 11))
+        diff = "@@ -2,1 +2,3 @@\n-2\n+2a\n+2b\n+2c\n@@ -8,2 +10,1 @@\n-8\n 9"
+        _, content = self.edit(original, diff=diff)
+        self.assertEqual(content, "1\n2a\n2b\n2c\n3\n4\n5\n6\n7\n9\n10\n")
+
+    def test_diff_keeps_crlf(self):
+        _, content = self.edit("a\r\nb\r\n", diff="@@ -2,1 +2,1 @@\n-b\n+c")
+        self.assertEqual(content, "a\r\nc\r\n")
+
+    def test_diff_keeps_missing_final_newline(self):
+        _, content = self.edit("a\nb", diff="@@ -2,0 +3,1 @@\n+c")
+        self.assertEqual(content, "a\nb\nc")
+        _, content = self.edit("a\nb", diff="@@ -2,1 +2,1 @@\n-b\n+B")
+        self.assertEqual(content, "a\nB")
+
+    def test_diff_mismatch_leaves_file_untouched(self):
+        result, content = self.edit("a\nb\n", diff="@@ -1,1 +1,1 @@\n-x\n+y")
+        self.assertIn("context does not match", result)
+        self.assertEqual(content, "a\nb\n")
+
+    def test_search_replace_region_is_the_changed_lines(self):
+        original = "".join(f"{n}\n" for n in range(1, 21))
+        result, _ = self.edit(original, edits=[{"search": "10\n", "replace": "ten\n"}])
+        self.assertIn("@@ lines 8-12 @@", result)
+
+    def test_search_replace_regions_sorted_and_merged(self):
+        original = "".join(f"line {n}.\n" for n in range(1, 21))
+        edits = [{"search": "line 4.\n", "replace": "four\n"}, {"search": "line 3.\n", "replace": "three\n"}]
+        result, _ = self.edit(original, edits=edits)
+        self.assertIn("(1 regions changed)", result)
+        self.assertIn("@@ lines 1-6 @@", result)
+
+    def test_write_keeps_existing_permission_bits(self):
+        path = os.path.join(self.tmp.name, "f.txt")
+        with open(path, "w") as f:
+            f.write("a\n")
+        os.chmod(path, 0o640)
+        atomic_write(path, "b\n")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+
+    def test_new_file_mode_matches_open(self):
+        path = os.path.join(self.tmp.name, "new.txt")
+        atomic_write(path, "a\n")
+        plain = os.path.join(self.tmp.name, "plain.txt")
+        with open(plain, "w"):
+            pass
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), stat.S_IMODE(os.stat(plain).st_mode))
+
+if __name__ == "__main__":
+    unittest.main()
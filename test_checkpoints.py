@@ -0,0 +1,77 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from google.genai import types
+
+from call_function import call_function
+
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "pkg"))
+        self.write("pkg/real.py", "X = 1\n")
+
+    def path(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+    def write(self, rel_path, content):
+        with open(self.path(rel_path), "w") as f:
+            f.write(content)
+
+    def read(self, rel_path):
+        with open(self.path(rel_path)) as f:
+            return f.read()
+
+    def call(self, name, **args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            content = call_function(types.FunctionCall(name=name, args=args), False, None, self.root)
+        return content.parts[0].function_response.response["result"]
+
+    def test_revert_write_through_symlink(self):
+        os.symlink("pkg/real.py", self.path("alias.py"))
+        self.assertIn("Successfully", self.call("write_file", file_path="alias.py", content="X = 2\n"))
+        self.assertTrue(os.path.islink(self.path("alias.py")))
+        self.assertEqual(self.read("pkg/real.py"), "X = 2\n")
+
+        self.assertIn("pkg/real.py (restored)", self.call("revert"))
+        self.assertTrue(os.path.islink(self.path("alias.py")))
+        self.assertEqual(self.read("pkg/real.py"), "X = 1\n")
+
+    def test_hardlinks_stay_shared_after_write_and_revert(self):
+        os.link(self.path("pkg/real.py"), self.path("pkg/twin.py"))
+        self.call("apply_edit", file_path="pkg/real.py", edits=[{"search": "X = 1", "replace": "X = 3"}])
+        self.assertTrue(os.path.samefile(self.path("pkg/real.py"), self.path("pkg/twin.py")))
+        self.assertEqual(self.read("pkg/twin.py"), "X = 3\n")
+
+        self.call("revert")
+        self.assertTrue(os.path.samefile(self.path("pkg/real.py"), self.path("pkg/twin.py")))
+        self.assertEqual(self.read("pkg/twin.py"), "X = 1\n")
+
+    def test_unshared_file_replaced_and_restored(self):
+        inode = os.stat(self.path("pkg/real.py")).st_ino
+        self.call("write_file", file_path="pkg/real.py", content="X = 4\n")
+        self.assertNotEqual(os.stat(self.path("pkg/real.py")).st_ino, inode)
+        self.call("write_file", file_path="pkg/real.py", content="X = 5\n")    # Same turn: first version kept
+        self.call("revert")
+        self.assertEqual(self.read("pkg/real.py"), "X = 1\n")
+        self.assertEqual(os.stat(self.path("pkg/real.py")).st_nlink, 1)
+
+    def test_revert_deletes_files_created_after_checkpoint(self):
+        self.call("write_file", file_path="pkg/new.py", content="Y = 1\n")
+        self.assertTrue(os.path.exists(self.path("pkg/new.py")))
+        self.assertIn("pkg/new.py (deleted)", self.call("revert"))
+        self.assertFalse(os.path.exists(self.path("pkg/new.py")))
+        self.assertEqual(sorted(os.listdir(self.path("pkg"))), ["real.py"])     # No temp files left
+
+    def test_revert_without_checkpoints(self):
+        self.assertTrue(self.call("revert").startswith("Error: no checkpoints yet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from functions import get_file_content as module
+from functions.get_file_content import get_file_content
+
+
+class TestRangedReads(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def write(self, content, name="f.txt"):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(content)
+
+    def read(self, offset=None, limit=None, name="f.txt"):
+        return get_file_content(self.root, name, offset, limit)
+
+    def test_first_and_last_lines(self):
+        self.write("a\nb\nc\n")
+        self.assertEqual(self.read(1, 1), 'a\n[...File "f.txt" lines 1-1 of 3]')
+        self.assertEqual(self.read(3, 1), 'c\n[...File "f.txt" lines 3-3 of 3]')
+        self.assertEqual(self.read(2), 'b\nc\n[...File "f.txt" lines 2-3 of 3]')
+
+    def test_limit_past_the_end(self):
+        self.write("a\nb\nc\n")
+        self.assertEqual(self.read(2, 10), 'b\nc\n[...File "f.txt" lines 2-3 of 3]')
+
+    def test_offset_past_the_end(self):
+        self.write("a\nb\nc\n")
+        self.assertEqual(self.read(4, 1), '[...File "f.txt" has only 3 lines]')
+
+    def test_empty_file(self):
+        self.write("")
+        self.assertEqual(self.read(1, 5), '[...File "f.txt" is empty]')
+
+    def test_no_trailing_newline(self):
+        self.write("a\nb\nc")
+        self.assertEqual(self.read(3, 1), 'c[...File "f.txt" lines 3-3 of 3]')
+        self.assertEqual(self.read(4, 1), '[...File "f.txt" has only 3 lines]')
+
+    def test_lines_across_index_blocks(self):
+        lines = [f"line {n}\n" for n in range(1, 201)]
+        with mock.patch.object(module, "LINE_INDEX_BLOCK", 16):      # Many blocks, lines straddle them
+            self.write("".join(lines), "blocks.txt")
+            for first in (1, 37, 128, 200):
+                expected = "".join(lines[first - 1:first + 2])
+                result = self.read(first, 3, name="blocks.txt")
+                self.assertTrue(result.startswith(expected), (first, result))
+
+    def test_invalid_range_rejected(self):
+        self.write("a\nb\n")
+        self.assertEqual(self.read(0, 1), "Error: offset must be at least 1, got 0")
+        self.assertEqual(self.read(-3), "Error: offset must be at least 1, got -3")
+        self.assertEqual(self.read(1, -1), "Error: limit must not be negative, got -1")
+        self.assertEqual(self.read(1, 0), 'a\nb\n[...File "f.txt" lines 1-2 of 2]')     # 0 reads to the end
+
+    def test_index_rebuilt_after_change(self):
+        self.write("a\nb\n")
+        self.assertEqual(self.read(2, 1), 'b\n[...File "f.txt" lines 2-2 of 2]')
+        self.write("a\nb\nc\nd\n")
+        self.assertEqual(self.read(4, 1), 'd\n[...File "f.txt" lines 4-4 of 4]')
+
+
+if __name__ == "__main__":
+    unittest.main()
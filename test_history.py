@@ -0,0 +1,89 @@
+import unittest
+from types import SimpleNamespace
+
+from google.genai import types
+
+from history import HistoryManager
+from output_compression import compress_output
+
+
+def numbered(last, **changes):
+    return "".join(changes.get(f"l{n}", f"line {n}\n") for n in range(1, last + 1))
+
+
+class TestHistoryManager(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryManager(token_budget=1000, keep_turns=1)
+        self.messages = [types.Content(role="user", parts=[types.Part(text="fix it")])]
+
+    def turn(self, *calls, text=None, prompt_tokens=100):
+        """Appends a model turn making `calls` [(name, args, result)] and their responses."""
+        parts = [types.Part(text=text)] if text else []
+        responses = []
+        for name, args, result in calls:
+            parts.append(types.Part(function_call=types.FunctionCall(name=name, args=args)))
+            result, extra = compress_output(name, args, result, self.history)
+            responses.append(types.Part.from_function_response(name=name, response={"result": result, **extra}))
+        self.history.record_usage(SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=10))
+        self.messages.append(types.Content(role="model", parts=parts))
+        self.messages.append(types.Content(role="tool", parts=responses))
+        return self.history.compact(self.messages)
+
+    def response(self, turn):
+        return self.messages[2 * turn].parts[0].function_response.response
+
+    def test_no_compaction_under_budget(self):
+        for n in range(3):
+            self.assertEqual(self.turn(("run_python_file", {"file_path": "main.py"}, f"output {n}" * 50)), 0)
+        self.assertFalse(self.response(1).get("compacted"))
+
+    def test_old_turns_compacted_over_budget(self):
+        self.turn(("run_python_file", {"file_path": "main.py"}, "old output " * 50))
+        changed = self.turn(("run_python_file", {"file_path": "tests.py"}, "new output"), prompt_tokens=5000)
+        self.assertEqual(changed, 1)
+        self.assertTrue(self.response(1)["compacted"])
+        self.assertIn("[compacted run_python_file(file_path='main.py')", self.response(1)["result"])
+        self.assertEqual(self.response(2)["result"], "new output")
+
+    def test_superseded_read_compacted_under_budget(self):
+        self.turn(("get_file_content", {"file_path": "f.py"}, numbered(10)))
+        self.turn(("get_file_content", {"file_path": "f.py"}, numbered(3)))
+        self.assertEqual(self.response(1)["result"], '[superseded by a later read of "f.py"]')
+        self.assertEqual(self.response(2)["result"], numbered(3))
+
+    def test_write_and_edit_payloads_compacted(self):
+        self.turn(
+            ("write_file", {"file_path": "a.py", "content": "x" * 500}, "Successfully wrote"),
+            ("apply_edit", {"file_path": "b.py", "edits": [{"search": "s" * 40, "replace": "r" * 60}]}, "Successfully edited"),
+            ("apply_edit", {"file_path": "c.py", "diff": "@@ -1 +1 @@\n-a\n+b"}, "Successfully edited"),
+        )
+        self.turn(("run_python_file", {"file_path": "main.py"}, "ok"), prompt_tokens=5000)
+        calls = [part.function_call.args for part in self.messages[1].parts]
+        self.assertEqual(calls[0]["content"], "[compacted: 500 chars written]")
+        self.assertEqual(calls[1]["edits"], [{"search": "[compacted: 40 chars searched]",
+                                              "replace": "[compacted: 60 chars replaced]"}])
+        self.assertEqual(calls[2]["diff"], "[compacted: 17 chars of diff]")
+        self.assertEqual(calls[1]["file_path"], "b.py")
+
+    def test_delta_base_kept_after_an_older_delta_is_superseded(self):
+        self.turn(("get_file_content", {"file_path": "f.py"}, numbered(100)))
+        self.turn(("get_file_content", {"file_path": "f.py"}, numbered(100, l50="changed\n")))
+        self.turn(("get_file_content", {"file_path": "f.py"}, numbered(100, l50="again\n")))
+        self.assertEqual(self.response(3)["delta_of_turn"], 0)
+        self.assertEqual(self.response(2)["result"], '[superseded by a later read of "f.py"]')
+        # Later passes must not mistake the compacted delta for a newer full read
+        self.turn(("run_python_file", {"file_path": "main.py"}, "ok"))
+        self.assertEqual(self.response(1)["result"], numbered(100))
+        _, extra = compress_output("get_file_content", {"file_path": "f.py"}, numbered(100, l60="x\n"), self.history)
+        self.assertEqual(extra, {"delta_of_turn": 0})
+
+    def test_compacted_base_stops_deltas(self):
+        self.turn(("get_file_content", {"file_path": "f.py"}, numbered(100)))
+        self.turn(("run_python_file", {"file_path": "main.py"}, "ok"), prompt_tokens=5000)
+        self.assertTrue(self.response(1)["compacted"])
+        new = numbered(100, l60="x\n")
+        self.assertEqual(compress_output("get_file_content", {"file_path": "f.py"}, new, self.history), (new, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
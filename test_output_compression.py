@@ -0,0 +1,114 @@
+import unittest
+
+import output_compression
+from history import HistoryManager
+from output_compression import compress_output
+
+
+def numbered(first, last, **changes):
+    return "".join(changes.get(f"l{n}", f"line {n}\n") for n in range(first, last + 1))
+
+
+def traceback_text(frames, error="RecursionError: maximum recursion depth exceeded"):
+    lines = ["Traceback (most recent call last):"]
+    for name, line in frames:
+        lines.append(f'  File "/tmp/app.py", line {line}, in {name}')
+        lines.append(f"    {name}()")
+    return "\n".join(lines + [error])
+
+
+class TestCollapseTracebacks(unittest.TestCase):
+    def compress(self, text):
+        return compress_output("run_python_file", {"file_path": "app.py"}, text)[0]
+
+    def test_collapses_recursion_cycle(self):
+        text = traceback_text([("main", 1)] + [("ping", 5), ("pong", 9)] * 50)
+        result = self.compress(text)
+        self.assertIn("[Previous 2 frames repeated 49 more times]", result)
+        self.assertEqual(result.count("in ping"), 1)
+        self.assertTrue(result.endswith("RecursionError: maximum recursion depth exceeded"))
+
+    def test_keeps_short_repeats(self):
+        text = traceback_text([("main", 1), ("f", 5), ("f", 5)])
+        self.assertEqual(self.compress(text), text)
+
+    def test_drops_identical_tracebacks(self):
+        block = traceback_text([("main", 1), ("f", 5)], "ValueError: bad")
+        other = traceback_text([("main", 1), ("g", 7)], "KeyError: 'x'")
+        result = self.compress("\n".join([block, "retrying", block, other]))
+        self.assertEqual(result.count("ValueError: bad"), 1)
+        self.assertIn("[Traceback identical to an earlier one omitted]", result)
+        self.assertIn("KeyError: 'x'", result)
+
+
+class TestSummarizeListing(unittest.TestCase):
+    def test_summarizes_entries_past_the_limit(self):
+        count = output_compression.LISTING_MAX_ENTRIES + 5
+        lines = [f"- f{n}.py: file_size=10 bytes, is_dir=False" for n in range(count)]
+        lines.append("- sub: file_size=0 bytes, is_dir=True")
+        result = compress_output("get_files_info", {"directory": "."}, "\n".join(lines))[0].split("\n")
+        self.assertEqual(result[0], "- sub: file_size=0 bytes, is_dir=True")
+        self.assertEqual(len(result), output_compression.LISTING_MAX_ENTRIES + 1)
+        self.assertEqual(result[-1], "[...6 more entries: 0 directories, 6 files, 60 bytes; "
+                                     "use get_project_tree with a pattern to narrow the listing]")
+
+
+class TestElideUnchanged(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryManager()
+
+    def read(self, text, **args):
+        return compress_output("get_file_content", {"file_path": "f.py", **args}, text, self.history)
+
+    def test_changed_line_with_final_newline(self):
+        self.read(numbered(1, 100))
+        result, extra = self.read(numbered(1, 100, l50="line 50 changed\n"))
+        self.assertEqual(extra, {"delta_of_turn": 0})
+        self.assertEqual(result.split("\n")[1:], [
+            "[lines 1-47 unchanged]",
+            "48: line 48", "49: line 49", "50: line 50 changed", "51: line 51", "52: line 52",
+            "[lines 53-100 unchanged]",
+        ])
+
+    def test_insertion_and_removal_renumber(self):
+        self.read(numbered(1, 100))
+        result, _ = self.read(numbered(1, 100, l10="", l80="line 80\ninserted\n"))
+        lines = result.split("\n")
+        self.assertIn("[1 line removed here]", lines)
+        self.assertIn("10: line 11", lines)
+        self.assertIn("80: inserted", lines)
+        self.assertEqual(lines[-1], "[lines 83-100 unchanged]")
+
+    def test_offset_numbers_lines_from_the_offset(self):
+        self.read(numbered(201, 300), offset=201, limit=100)
+        result, _ = self.read(numbered(201, 300, l250="changed\n"), offset=201, limit=100)
+        lines = result.split("\n")
+        self.assertEqual(lines[1], "[lines 201-247 unchanged]")
+        self.assertIn("250: changed", lines)
+        self.assertEqual(lines[-1], "[lines 253-300 unchanged]")
+
+    def test_large_change_sends_full_read(self):
+        self.read(numbered(1, 10))
+        new = numbered(1, 10, l2="x\n", l5="y\n", l8="z\n")
+        self.assertEqual(self.read(new), (new, {}))
+
+
+class TestEnforceBudget(unittest.TestCase):
+    def setUp(self):
+        output_compression.TOOL_OUTPUT_BUDGETS["budget_test"] = 100
+        self.addCleanup(output_compression.TOOL_OUTPUT_BUDGETS.pop, "budget_test")
+
+    def test_small_result_unchanged(self):
+        self.assertEqual(compress_output("budget_test", {}, "ok")[0], "ok")
+
+    def test_cut_keeps_head_tail_and_valid_utf8(self):
+        text = "é" * 100 + "€" * 100     # 2- and 3-byte characters, so cuts land mid-character
+        result = compress_output("budget_test", {}, text)[0]
+        head, notice, tail = result.split("\n")
+        self.assertTrue(set(head) == {"é"} and set(tail) == {"€"})
+        self.assertLessEqual(len(head.encode()) + len(tail.encode()), 100)
+        self.assertIn("bytes omitted to fit the 100-byte output budget of budget_test", notice)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from google.genai import types
+
+import prefetch
+from functions.get_file_content import get_file_content
+from prefetch import PrefetchRun, likely_next_files, prefetching
+from tool_cache import ToolCache
+
+
+def tool_turn(name, args, result):
+    """A model call and its tool response, as the agent loop appends them."""
+    return [
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))]),
+        types.Content(role="tool", parts=[types.Part.from_function_response(name=name, response={"result": result})]),
+    ]
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.realpath(self.tmp.name)
+        for name, content in (("main.py", "import helper\n"), ("helper.py", "X = 1\n"), ("other.py", "Y = 2\n")):
+            with open(os.path.join(self.root, name), "w") as f:
+                f.write(content)
+        traceback = (
+            "Traceback (most recent call last):\n"
+            f'  File "{self.root}/main.py", line 1, in <module>\n'
+            f'  File "{self.root}/other.py", line 1, in <module>\n'
+            "NameError: name 'Z' is not defined"
+        )
+        self.messages = tool_turn("run_python_file", {"file_path": "main.py"}, traceback)
+        self.cache = ToolCache()
+        patcher = mock.patch.object(prefetch, "tool_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read(self, file_path):
+        return self.cache.call("get_file_content", {"working_directory": self.root, "file_path": file_path},
+                               get_file_content)
+
+    def test_traceback_files_innermost_first(self):
+        self.assertEqual(likely_next_files(self.messages, self.root), ["other.py", "main.py"])
+
+    def test_read_imports_of_files_just_read(self):
+        messages = tool_turn("get_file_content", {"file_path": "main.py"}, "import helper\n")
+        self.assertEqual(likely_next_files(messages, self.root), ["helper.py"])
+
+    def test_files_read_during_block_and_served_as_hits(self):
+        with prefetching(self.messages, self.root) as run:
+            run.thread.join()
+        self.assertFalse(run.thread.is_alive())
+        self.assertEqual(self.read("other.py")[::2], ("Y = 2\n", True))
+        self.assertEqual(self.cache.prefetch_hits, 1)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_stop_is_idempotent_and_joins(self):
+        with prefetching(self.messages, self.root) as run:
+            run.stop()
+            self.assertFalse(run.thread.is_alive())
+            run.stop()
+
+    def test_disabled_without_budget_or_messages(self):
+        with prefetching(self.messages, self.root, max_bytes=0) as run:
+            self.assertIsNone(run)
+        with prefetching([], self.root) as run:
+            self.assertIsNone(run)
+        self.assertEqual(self.cache.entries, {})
+
+    def test_stopped_run_reads_nothing(self):
+        run = PrefetchRun(self.messages, self.root, max_bytes=1000, max_files=5)
+        run.stop()      # Tools started before the thread got going
+        run._run()
+        self.assertEqual(self.cache.entries, {})
+
+    def test_write_drops_prefetched_entry(self):
+        with prefetching(self.messages, self.root) as run:
+            run.thread.join()
+        self.cache.invalidate(os.path.join(self.root, "other.py"))
+        self.assertEqual({key[1] for key in self.cache.prefetched}, {os.path.join(self.root, "main.py")})
+        self.assertFalse(self.read("other.py")[2])
+        self.assertEqual(self.cache.prefetch_hits, 0)
+
+    def test_next_run_drops_unserved_guesses(self):
+        with prefetching(self.messages, self.root) as run:
+            run.thread.join()
+        messages = self.messages + tool_turn("get_file_content", {"file_path": "main.py"}, "import helper\n")
+        with prefetching(messages, self.root) as run:
+            run.thread.join()
+        self.assertEqual({key[1] for key in self.cache.prefetched}, {os.path.join(self.root, "helper.py")})
+
+
+if __name__ == "__main__":
+    unittest.main()
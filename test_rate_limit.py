@@ -0,0 +1,142 @@
+import asyncio
+import random
+import unittest
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from rate_limit import RateLimiter, RateLimitedClient, TokenBucket
+
+
+def api_error(code):
+    return errors.APIError(code, {"error": {"message": "fake", "status": "FAKE"}})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+def chunk(text, total_tokens=None):
+    usage = SimpleNamespace(total_token_count=total_tokens) if total_tokens else None
+    return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class FakeModels:
+    """Answers with the next item of `outcomes`: an exception to raise or a response."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def generate_content(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeAsyncModels(FakeModels):
+    """Streams the chunks of the next outcome; an exception among them is raised mid-stream."""
+
+    async def generate_content_stream(self, **kwargs):
+        outcome = self.generate_content(**kwargs)
+
+        async def stream():
+            for item in outcome:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        return stream()
+
+
+class TestRateLimit(unittest.TestCase):
+    def make_client(self, models=None, aio_models=None, max_attempts=4, rpm=0, tpm=0):
+        self.clock = FakeClock()
+        limiter = RateLimiter(rpm, tpm, clock=self.clock, sleep=self.clock.sleep)
+        fake = SimpleNamespace(models=models or FakeModels([]), aio=SimpleNamespace(models=aio_models))
+        return RateLimitedClient(
+            fake, limiter, max_attempts=max_attempts, sleep=self.clock.sleep,
+            async_sleep=self.clock.async_sleep, rng=random.Random(0),
+        )
+
+    def stream(self, client):
+        async def collect():
+            stream = await client.aio.models.generate_content_stream(model="m", contents=[])
+            return [item.text async for item in stream]
+        return asyncio.run(collect())
+
+    def test_bucket_waits_for_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+        bucket.acquire()
+        self.assertAlmostEqual(sum(clock.sleeps), 30.0)
+
+    def test_retries_transient_errors(self):
+        models = FakeModels([api_error(429), api_error(503), chunk("ok")])
+        client = self.make_client(models)
+        self.assertEqual(client.models.generate_content(model="m", contents=[]).text, "ok")
+        self.assertEqual(models.calls, 3)
+        self.assertEqual(client.models.retries, 2)
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+    def test_raises_client_errors_without_retry(self):
+        models = FakeModels([api_error(400)])
+        client = self.make_client(models)
+        with self.assertRaises(errors.APIError):
+            client.models.generate_content(model="m", contents=[])
+        self.assertEqual(models.calls, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        models = FakeModels([api_error(500)] * 3)
+        client = self.make_client(models, max_attempts=3)
+        with self.assertRaises(errors.APIError):
+            client.models.generate_content(model="m", contents=[])
+        self.assertEqual(models.calls, 3)
+
+    def test_stream_retried_until_first_chunk(self):
+        aio_models = FakeAsyncModels([api_error(429), [api_error(503)], [chunk("a"), chunk("b", 10)]])
+        client = self.make_client(aio_models=aio_models)
+        self.assertEqual(self.stream(client), ["a", "b"])
+        self.assertEqual(aio_models.calls, 3)
+        self.assertEqual(client.aio.models.retries, 2)
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+    def test_stream_error_after_first_chunk_is_raised(self):
+        aio_models = FakeAsyncModels([[chunk("a"), api_error(503)]])
+        client = self.make_client(aio_models=aio_models)
+        with self.assertRaises(errors.APIError):
+            self.stream(client)
+        self.assertEqual(aio_models.calls, 1)
+
+    def test_stream_waits_on_the_shared_limiter(self):
+        aio_models = FakeAsyncModels([[chunk("a")], [chunk("b")]])
+        client = self.make_client(aio_models=aio_models, rpm=1)
+        self.stream(client)
+        self.stream(client)
+        self.assertAlmostEqual(sum(self.clock.sleeps), 60.0)
+
+    def test_stream_usage_corrects_token_estimate(self):
+        aio_models = FakeAsyncModels([[chunk("a"), chunk("b", 1000)]])
+        client = self.make_client(aio_models=aio_models, tpm=10000)
+        self.stream(client)
+        self.assertAlmostEqual(client.aio.models.limiter.tokens.tokens, 10000 - 1000, delta=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
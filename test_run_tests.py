@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from functions.run_tests import run_tests, note_changed
+
+TEST_TEMPLATE = """import unittest
+from {module} import VALUE
+
+
+class TestValue(unittest.TestCase):
+    def test_value(self):
+        self.assertEqual(VALUE, 1)
+"""
+
+
+class TestRunTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.realpath(self.tmp.name)
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_nested_tests_import_project_packages(self):
+        self.write("pkg/__init__.py", "")
+        self.write("pkg/mod.py", "VALUE = 1\n")
+        self.write("tests/test_mod.py", TEST_TEMPLATE.format(module="pkg.mod"))
+        result = run_tests(self.root)
+        self.assertTrue(result.startswith("Ran 1 tests (all): 1 pass"), result)
+
+    def test_changes_stay_pending_for_directories_not_run(self):
+        for name in ("a", "b"):
+            self.write(f"{name}/__init__.py", "")
+            self.write(f"{name}/mod_{name}.py", "VALUE = 1\n")
+            self.write(f"{name}/test_{name}.py", TEST_TEMPLATE.format(module=f"{name}.mod_{name}"))
+        self.assertIn("2 pass", run_tests(self.root))
+
+        note_changed(self.write("b/mod_b.py", "VALUE = 2\n"))
+        self.assertEqual(run_tests(self.root, directory="a"), "Ran 1 tests (all): 1 pass")
+        result = run_tests(self.root)
+        self.assertTrue(result.startswith("Ran 1 tests (affected by b/mod_b.py): 1 fail"), result)
+        self.assertIn("FAIL b/test_b.py::test_b.TestValue.test_value", result)
+        self.assertEqual(run_tests(self.root), "No tests affected by the files changed since the last run.")
+
+    def test_result_has_no_timing(self):
+        self.write("test_x.py", TEST_TEMPLATE.format(module="x"))
+        self.write("x.py", "VALUE = 1\n")
+        self.assertEqual(run_tests(self.root), "Ran 1 tests (all): 1 pass")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from google.genai import types
+
+from call_function import call_function
+from functions.get_file_content import get_file_content
+from history import HistoryManager
+from tool_cache import ToolCache
+
+
+class TestToolCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.path = os.path.join(self.root, "f.py")
+        self.write("print(1)\n")
+        self.args = {"working_directory": self.root, "file_path": "f.py"}
+
+    def write(self, content, mtime_ns=None):
+        with open(self.path, "w") as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def call(self, name, history=None, **args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            content = call_function(types.FunctionCall(name=name, args=args), False, history, self.root)
+        return content.parts[0].function_response.response
+
+    def test_hit_until_mtime_or_size_changes(self):
+        cache = ToolCache()
+        self.assertEqual(cache.call("get_file_content", self.args, get_file_content)[::2], ("print(1)\n", False))
+        self.assertEqual(cache.call("get_file_content", self.args, get_file_content)[::2], ("print(1)\n", True))
+
+        self.write("print(22)\n")    # New size
+        self.assertEqual(cache.call("get_file_content", self.args, get_file_content)[::2], ("print(22)\n", False))
+
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        self.write("print(33)\n", mtime_ns + 1_000_000)     # Same size, new mtime
+        self.assertEqual(cache.call("get_file_content", self.args, get_file_content)[::2], ("print(33)\n", False))
+
+    def test_other_args_are_separate_entries(self):
+        cache = ToolCache()
+        cache.call("get_file_content", self.args, get_file_content)
+        ranged = dict(self.args, offset=1, limit=1)
+        result, _, hit = cache.call("get_file_content", ranged, get_file_content)
+        self.assertFalse(hit)
+        self.assertTrue(result.startswith("print(1)\n[...File"))
+
+    def test_write_invalidates_even_if_fingerprint_matches(self):
+        self.assertEqual(self.call("get_file_content", file_path="f.py")["result"], "print(1)\n")
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        self.call("write_file", file_path="f.py", content="print(2)\n")
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))    # Same size and mtime as the cached read
+        self.assertEqual(self.call("get_file_content", file_path="f.py")["result"], "print(2)\n")
+
+    def test_script_runs_invalidate_listings(self):
+        self.assertNotIn("new.txt", self.call("get_files_info")["result"])
+        with open(os.path.join(self.root, "make.py"), "w") as f:
+            f.write("open('new.txt', 'w').write('x')\n")
+        self.call("run_python_file", file_path="make.py")
+        self.assertIn("new.txt", self.call("get_files_info")["result"])
+
+    def test_unchanged_marker_only_for_identical_content(self):
+        history = HistoryManager()
+        self.assertEqual(self.call("get_file_content", history, file_path="f.py")["result"], "print(1)\n")
+        repeat = self.call("get_file_content", history, file_path="f.py")
+        self.assertEqual(repeat["unchanged_since_turn"], 0)
+        self.assertIn("unchanged since turn 0", repeat["result"])
+
+        self.call("write_file", history, file_path="f.py", content="print(3)\n")
+        after = self.call("get_file_content", history, file_path="f.py")
+        self.assertNotIn("unchanged_since_turn", after)
+        self.assertEqual(after["result"], "print(3)\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
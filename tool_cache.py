@@ -0,0 +1,146 @@
+import os
+import threading
+from collections import OrderedDict
+from config import TOOL_CACHE_MAX_BYTES
+from functions.path_validator import stat_path
+
+
+def target_path(args):
+    """Absolute, normalized path a tool call operates on."""
+    abs_working_dir = os.path.abspath(args["working_directory"])
+    path = args.get("file_path", args.get("directory", "."))
+    return os.path.normpath(os.path.join(abs_working_dir, path))
+
+
+def fingerprint(abs_path):
+    """(st_mtime_ns, st_size) of abs_path, or None if it cannot be stat'ed.
+
+    Shares the memoized stat with the tool itself, so a cached read costs one stat.
+    """
+    try:
+        st = stat_path(abs_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size) if st else None
+
+
+class ToolCache:
+    """LRU cache of read-only tool results, bounded by total result size.
+
+    Entries are keyed on (tool, normalized path, other args) and are only served while
+    the path's mtime and size still match the values seen when the result was made.
+    """
+
+    def __init__(self, max_bytes=TOOL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()    # key -> (fingerprint, result)
+        self.total_bytes = 0
+        self.prefetched = {}            # key -> size of entries prefetched but not yet served
+        self.hits = 0
+        self.misses = 0
+        self.prefetch_hits = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(function_name, args):
+        extra = tuple(sorted((k, repr(v)) for k, v in args.items()
+                             if k not in ("working_directory", "file_path", "directory")))
+        return function_name, target_path(args), extra
+
+    def call(self, function_name, args, function):
+        """Returns (result, fingerprint, hit) for function(**args), served from cache when valid."""
+        key = self.key(function_name, args)
+        current = fingerprint(key[1])
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and current is not None and entry[0] == current:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                if self.prefetched.pop(key, None) is not None:
+                    self.prefetch_hits += 1
+                return entry[1], current, True
+            self.misses += 1
+
+        result = function(**args)
+        if current is not None and self.max_bytes > 0 and not result.startswith("Error"):
+            self._store(key, current, result)
+        return result, current, False
+
+    def prefetch(self, function_name, args, function, max_bytes):
+        """Stores function(**args) ahead of a likely call; returns the bytes added (0 if skipped).
+
+        Unserved prefetched results are kept to max_bytes in total and do not count as misses.
+        """
+        key = self.key(function_name, args)
+        current = fingerprint(key[1])
+        if current is None or self.max_bytes <= 0:
+            return 0
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == current:
+                return 0
+            room = max_bytes - sum(self.prefetched.values())
+        if room <= 0:
+            return 0
+        result = function(**args)
+        if result.startswith("Error") or len(result) > room:
+            return 0
+        self._store(key, current, result)
+        with self.lock:
+            if key in self.entries:
+                self.prefetched[key] = len(result)
+        return len(result)
+
+    def drop_prefetched(self):
+        """Drops prefetched results that were never served, e.g. guesses from an earlier turn."""
+        with self.lock:
+            for key in self.prefetched:
+                entry = self.entries.pop(key, None)
+                if entry:
+                    self.total_bytes -= len(entry[1])
+            self.prefetched.clear()
+
+    def _store(self, key, current, result):
+        size = len(result)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.total_bytes -= len(old[1])
+            self.prefetched.pop(key, None)
+            self.entries[key] = (current, result)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:    # Evict least recently used
+                evicted_key, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.prefetched.pop(evicted_key, None)
+
+    def invalidate(self, abs_path):
+        """Drops entries for abs_path and for listings of its parent directory."""
+        parent = os.path.dirname(abs_path)
+        with self.lock:
+            for key in [k for k in self.entries if k[1] in (abs_path, parent)]:
+                self.total_bytes -= len(self.entries.pop(key)[1])
+                self.prefetched.pop(key, None)
+
+    def invalidate_listings(self):
+        """Drops every directory listing; child size changes do not touch a directory's mtime."""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == "get_files_info"]:
+                self.total_bytes -= len(self.entries.pop(key)[1])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.prefetched.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        return (
+            f"Tool cache: {self.hits} hits ({self.prefetch_hits} prefetched), {self.misses} misses, "
+            f"{len(self.entries)} entries, {self.total_bytes} bytes"
+        )
+
+
+tool_cache = ToolCache()